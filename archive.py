@@ -0,0 +1,180 @@
+import argparse
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from convert_html_to_csv import available_weeks, parse_weeks
+from fantasy_objects import Season, Week
+from season_cache import week_from_df, week_to_df
+from season_loader import load_season
+from utils import SEASON
+
+'''
+Multi-season archive, partitioned by year and week
+
+archive/players/year=2024/week=3/part-0.parquet   one row per roster slot (Week.player_df)
+archive/teams/year=2024/week=3/part-0.parquet     one row per team (Week.team_df plus the Yahoo team numbers)
+
+Every read goes through pyarrow.dataset, so a query only opens the year/week partitions its filter
+keeps and only reads the columns it asks for, all-time questions never load whole seasons. A team
+across seasons (a "manager") is its Yahoo team number, team_key, the name shown is the latest one.
+
+python archive.py add 2024                    # archive matchup_data/ as the 2024 season
+python archive.py add 2023 --source old/2023  # a season kept in old/2023/matchup_data
+python archive.py career                      # career PF, PA and record of every manager
+python archive.py best -n 10 --years 2022-2024
+python archive.py h2h "Pitter Patter" "EZ DubZ"
+'''
+
+ARCHIVE_DIR = "archive"
+TABLES = ("players", "teams")
+# player_df's categoricals are stored as plain strings, the dictionaries differ from week to week
+STRING_COLUMNS = ["team", "player", "position", "nfl_team", "slot"]
+
+
+def partition_path(table: str, year: int, week: int, root=ARCHIVE_DIR) -> str:
+    return os.path.join(root, table, f"year={year}", f"week={week}", "part-0.parquet")
+
+
+def _write(df: pd.DataFrame, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # write then rename so a concurrent query never reads a half written partition
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), f"{path}.tmp")
+    os.replace(f"{path}.tmp", path)
+
+
+def team_table(week: Week) -> pd.DataFrame:
+    '''Returns Week.team_df, the Yahoo team number of every team and its opponent included'''
+    return week.team_df.astype({"team_key": "Int16", "opponent_key": "Int16"})
+
+
+def archive_week(week: Week, year: int, root=ARCHIVE_DIR):
+    '''Add (or replace) a Week in the archive'''
+    players = week_to_df(week).drop(columns="week").astype({col: object for col in STRING_COLUMNS})
+    _write(players, partition_path("players", year, week.week, root))
+    _write(team_table(week), partition_path("teams", year, week.week, root))
+
+
+def archive_season(year: int, weeks: list[Week], root=ARCHIVE_DIR):
+    for week in weeks:
+        archive_week(week, year, root)
+
+
+def dataset(table: str, root=ARCHIVE_DIR) -> ds.Dataset:
+    if table not in TABLES:
+        raise ValueError(f"unknown table {table}, expected one of {TABLES}")
+    return ds.dataset(os.path.join(root, table), format="parquet", partitioning="hive")
+
+
+def read(table: str, columns: None | list[str] = None, years=None, weeks=None, where: None | ds.Expression = None,
+         root=ARCHIVE_DIR) -> pd.DataFrame:
+    '''Returns the rows of an archive table, filtered and projected before anything is read
+
+    years/weeks prune whole partitions, where is any pyarrow expression on the other columns,
+    e.g. ds.field("pf") > 150, which is checked against the parquet row group statistics first
+    '''
+    expression = where
+    for field, values in (("year", years), ("week", weeks)):
+        if values is not None:
+            clause = ds.field(field).isin(list(values))
+            expression = clause if expression is None else expression & clause
+    return dataset(table, root).to_table(columns=columns, filter=expression).to_pandas()
+
+
+def archived_years(root=ARCHIVE_DIR) -> list[int]:
+    '''Returns every archived season'''
+    return sorted(set(read("teams", columns=["year"], root=root)["year"]))
+
+
+def load_archived_season(year: int, root=ARCHIVE_DIR) -> Season:
+    '''Rebuild a Season (and its Weeks) from the archive, every Season aggregate then works as usual'''
+    df = read("players", years=[year], root=root)
+    if df.empty:
+        raise KeyError(f"{year} is not in the archive")
+    weeks = [week_from_df(week_df, week) for week, week_df in df.sort_values(["week", "matchup"], kind="stable").groupby("week", sort=True)]
+    # a past season has nothing left to play, utils.schedule is only the current season's
+    return Season(weeks, remaining_schedule=None if year == SEASON else {})
+
+
+def managers(root=ARCHIVE_DIR) -> pd.Series:
+    '''Returns the latest team name of every manager (team_key)'''
+    df = read("teams", columns=["year", "week", "team_key", "team"], root=root)
+    return df.sort_values(["year", "week"]).groupby("team_key")["team"].last()
+
+
+def career_totals(years=None, root=ARCHIVE_DIR) -> pd.DataFrame:
+    '''Returns the career PF, PA and record of every manager, highest PF first'''
+    df = read("teams", columns=["year", "team_key", "pf", "pa", "win"], years=years, root=root)
+    totals = df.groupby("team_key").agg(Seasons=("year", "nunique"), Games=("win", "size"), W=("win", "sum"),
+                                        PF=("pf", "sum"), PA=("pa", "sum"))
+    totals["L"] = totals["Games"] - totals["W"]
+    totals["PF/G"] = (totals["PF"] / totals["Games"]).round(2)
+    totals[["PF", "PA"]] = totals[["PF", "PA"]].round(2)
+    totals.insert(0, "Team", managers(root).reindex(totals.index))
+    return totals.sort_values(by="PF", ascending=False).reset_index()
+
+
+def best_weeks(n=10, years=None, root=ARCHIVE_DIR) -> pd.DataFrame:
+    '''Returns the n highest single-week scores'''
+    df = read("teams", columns=["year", "week", "team", "opponent", "pf", "pa"], years=years, root=root)
+    return df.nlargest(n, "pf").reset_index(drop=True)
+
+
+def _team_keys(team, root=ARCHIVE_DIR) -> list[int]:
+    '''Returns the team_key of a manager given by team_key or by any name they have used'''
+    if isinstance(team, int):
+        return [team]
+    keys = read("teams", columns=["team_key"], where=ds.field("team") == team, root=root)["team_key"].dropna().unique()
+    if len(keys) == 0:
+        raise KeyError(f"{team} is not in the archive")
+    return [int(key) for key in keys]
+
+
+def head_to_head(team1, team2, root=ARCHIVE_DIR) -> pd.DataFrame:
+    '''Returns every game team1 played against team2 (by name or team_key), oldest first'''
+    where = ds.field("team_key").isin(_team_keys(team1, root)) & ds.field("opponent_key").isin(_team_keys(team2, root))
+    df = read("teams", columns=["year", "week", "team", "opponent", "pf", "pa", "win"], where=where, root=root)
+    return df.sort_values(["year", "week"]).reset_index(drop=True)
+
+
+def main():
+    argParser = argparse.ArgumentParser()
+    argParser.add_argument("--root", default=ARCHIVE_DIR, help="archive directory")
+    commands = argParser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="archive a season")
+    add.add_argument("year", type=int)
+    add.add_argument("--source", default=".", help="directory holding the season's matchup_data/")
+    add.add_argument("--weeks", type=parse_weeks, help="weeks to archive, e.g. 1-14, default every week in matchup_data")
+    career = commands.add_parser("career", help="career totals of every manager")
+    career.add_argument("--years", type=parse_weeks, help="e.g. 2020-2024")
+    best = commands.add_parser("best", help="best single-week scores")
+    best.add_argument("-n", type=int, default=10)
+    best.add_argument("--years", type=parse_weeks, help="e.g. 2020-2024")
+    h2h = commands.add_parser("h2h", help="head-to-head history of two managers")
+    h2h.add_argument("team1")
+    h2h.add_argument("team2")
+    args = argParser.parse_args()
+
+    root = os.path.abspath(args.root)
+    if args.command == "add":
+        # the loaders read matchup_data/ from the working directory
+        cwd = os.getcwd()
+        os.chdir(args.source)
+        try:
+            weeks = load_season(args.weeks or available_weeks())
+        finally:
+            os.chdir(cwd)
+        archive_season(args.year, weeks, root)
+        print(f"archived {len(weeks)} weeks of {args.year}")
+    elif args.command == "career":
+        print(career_totals(args.years, root).to_string(index=False))
+    elif args.command == "best":
+        print(best_weeks(args.n, args.years, root).to_string(index=False))
+    else:
+        df = head_to_head(args.team1, args.team2, root)
+        print(df.to_string(index=False))
+        print(f"{int(df['win'].sum())}-{int((~df['win']).sum())}")
+
+if __name__ == "__main__":
+    main()
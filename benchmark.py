@@ -0,0 +1,527 @@
+from bs4 import BeautifulSoup
+from contextlib import contextmanager
+import pandas as pd
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+import plotly.express as px
+from boxplots import box_figure
+from convert_html_to_csv import league_matchup_table, output_path
+from fantasy_objects import BENCH_LINEUP, Roster, MatchUp, Week, Season
+from lineup import optimal_lineup
+from lxml import etree
+from matchup_parser import ROSTER_TABLE_IDS, TEAM_1_COLS, TEAM_2_COLS, _table_to_df, parse_matchup_html
+from playoff_odds import simulate_seeds
+from rankings import projected_record, schedule_matchups
+from utils import _name_and_team, parse_player, schedule, team_abbrev
+from season_cache import CACHE_DIR, load_weeks, matchup_paths
+from season_loader import load_season
+from synthetic_league import generate_league
+
+'''
+Micro benchmarks for the ingest pipeline, run against the checked in matchup_data season
+
+python benchmark.py              # run every benchmark
+python benchmark.py parser       # run a single benchmark
+
+and a scenario suite (parse, load, aggregate, rank) over a synthetic league, see synthetic_league.py
+
+python benchmark.py --suite --teams 14 --seasons 10 --save-baseline   # record the baseline
+python benchmark.py --suite --teams 14 --seasons 10 --check           # exit 1 if a scenario regressed
+'''
+
+WEEKS = range(1, 15)
+MATCHUPS = range(1, 7)
+# timings are only comparable on the machine they were taken on, so the baseline is kept out of git
+SUITE_BASELINE = "benchmark_baseline.json"
+# a scenario fails --check when it's this much slower than its baseline
+REGRESSION_TOLERANCE = 0.25
+
+
+def timeit(func, repeat=3) -> float:
+    '''Returns the best wall clock time of func over repeat runs'''
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(name: str, before: float, after: float):
+    print(f"{name:<40} before {before * 1000:>9.1f} ms   after {after * 1000:>9.1f} ms   {before / after:>6.1f}x")
+
+
+def legacy_convert_detailed_matchup(week, i) -> MatchUp:
+    '''The original double parse (BeautifulSoup header + pd.read_html tables), kept as the baseline'''
+    with open(F'matchup_data/week{week}/matchup_{i}.html') as fp:
+        soup = BeautifulSoup(fp, 'html.parser')
+    matchup_header = soup.find("section", {"id": "matchup-header"})
+    if week < 6:
+        team1 = matchup_header.find_all('div')[6].text
+        team2 = matchup_header.find_all('div')[19].text
+    else:
+        team1 = matchup_header.find_all('div')[5].text
+        team2 = matchup_header.find_all('div')[17].text
+    matchup_df = pd.read_html(f'matchup_data/week{week}/matchup_{i}.html')
+    team_1_roster = Roster(team1, matchup_df[1].iloc[:,1:4], matchup_df[2].iloc[:,1:4])
+    team_2_cols = ["Player.1", "Proj.1", "Fan Pts.1"]
+    team_2_roster = Roster(team2, matchup_df[1][team_2_cols], matchup_df[2][team_2_cols])
+    return MatchUp(team_1_roster, team_2_roster)
+
+
+def bench_parser():
+    '''Cold load of every matchup_{i}.html in the season'''
+    def _legacy():
+        for week in WEEKS:
+            for i in MATCHUPS:
+                legacy_convert_detailed_matchup(week, i)
+    def _single_pass():
+        for week in WEEKS:
+            for i in MATCHUPS:
+                parse_matchup_html(f'matchup_data/week{week}/matchup_{i}.html')
+    report("parse season matchups", timeit(_legacy, repeat=1), timeit(_single_pass))
+
+
+def bench_cache():
+    '''Cold load of the season by parsing the html vs mapping the consolidated arrow cache / reading the converted csv's'''
+    def _parse():
+        for week in WEEKS:
+            for i in MATCHUPS:
+                parse_matchup_html(f'matchup_data/week{week}/matchup_{i}.html')
+    load_weeks(WEEKS)  # make sure the cache is warm
+    report("load season from cache", timeit(_parse), timeit(lambda: load_weeks(WEEKS)))
+    report("league tables from matchup.csv",
+           timeit(lambda: [league_matchup_table(w) for w in WEEKS]), timeit(lambda: [pd.read_csv(output_path(w), index_col=0) for w in WEEKS]))
+
+
+def legacy_dataframe_for_csv(matchup: MatchUp) -> pd.DataFrame:
+    '''The original row by row MatchUp.dataframe_for_csv'''
+    columns = [matchup.team1_roster.team_name, "Position", "Fan Pts", "Roster Position", "Fan Pts.1", "Position.1", matchup.team2_roster.team_name]
+    starting_matchup_df = pd.DataFrame(columns=columns)
+    bench_matchup_df = pd.DataFrame(columns=columns)
+    roster_positions = ["QB", "WR", "WR", "RB", "RB", "W/R/T", "W/R/T", "TE", "DEF", "Total"]
+    for pos in range(len(roster_positions)):
+        if roster_positions[pos] == "Total":
+            row = [None, None, matchup.team1_roster.starting_points, roster_positions[pos], matchup.team2_roster.starting_points, None, None]
+        else:
+            team_1_player = list(matchup.team1_roster.roster.values())[pos]
+            team_2_player = list(matchup.team2_roster.roster.values())[pos]
+            row = [team_1_player.name, team_1_player.position, team_1_player.fan_pts, roster_positions[pos], team_2_player.fan_pts, team_2_player.position, team_2_player.name]
+        starting_matchup_df.loc[len(starting_matchup_df)] = row
+    for i in range(8):
+        team_1_player = list(matchup.team1_roster.roster.values())[i+9]
+        team_2_player = list(matchup.team2_roster.roster.values())[i+9]
+        row = [team_1_player.name, team_1_player.position, team_1_player.fan_pts, roster_positions[pos], team_2_player.fan_pts, team_2_player.position, team_2_player.name]
+        bench_matchup_df.loc[len(bench_matchup_df)] = row
+    bench_matchup_df.loc[len(bench_matchup_df)] = [None, None, matchup.team1_roster.bench_points, "Total", matchup.team2_roster.bench_points, None, None]
+    return pd.concat([starting_matchup_df, bench_matchup_df], ignore_index=True)
+
+
+def legacy_get_positions_pf(week: Week) -> pd.DataFrame:
+    '''The original row by row Week.get_positions_pf'''
+    keys = ["QB", "RB", "WR", "TE", "FLEX"]
+    df = pd.DataFrame(columns=["Team"] + keys)
+    for roster in week.league_rosters:
+        df.loc[len(df)] = [roster.team_name] + [roster.position_points(pos) for pos in keys]
+    return df
+
+
+def legacy_h2h_records(week: Week) -> dict[str, list[int]]:
+    '''The original Week.get_h2h_record, all-play records from the PF order of a 12 team league (on a copy, the original sorted in place)'''
+    rosters = sorted(week.league_rosters, key=lambda roster: roster.starting_points, reverse=True)
+    return {roster.team_name: [11-i, i] for i, roster in enumerate(rosters)}
+
+
+def legacy_advanced_df(week: Week) -> pd.DataFrame:
+    '''The original row by row Week.advanced_df'''
+    h2h = legacy_h2h_records(week)
+    advanced_df = pd.DataFrame(columns=["Team", "PF", "H2H", "Manager Eff"])
+    for roster in sorted(week.league_rosters, key=lambda roster: roster.starting_points, reverse=True):
+        advanced_df.loc[len(advanced_df)] = [roster.team_name, roster.starting_points, h2h[roster.team_name], "Nick"]
+    return advanced_df
+
+
+def legacy_season_totals(weeks: list[Week]) -> pd.DataFrame:
+    '''The original per team loop over every matchup that built the season_summary_df rows'''
+    df = pd.DataFrame(columns=["Team", "Record", "PF", "PA", "H2H", "PaP"])
+    for team in weeks[0].league_teams:
+        w, l, pf, pa, h2hw, h2hl, pap = 0, 0, 0, 0, 0, 0, 0
+        for week in weeks:
+            week_h2h = legacy_h2h_records(week)
+            for matchup in week.league_matchups:
+                if team in matchup.teams:
+                    pa += matchup.points_against(team)
+                    pf += matchup.points_for(team)
+                    pap += matchup.point_above_projected(team)
+                    if matchup.winner == team:
+                        w += 1
+                    else:
+                        l += 1
+                    h2h = week_h2h[team]
+                    h2hw += h2h[0]
+                    h2hl += h2h[1]
+        df.loc[len(df)] = [team, f"{w}-{l}", pf, pa, f"{h2hw}-{h2hl}", round(pap / len(weeks), 2)]
+    return df
+
+
+def legacy_league_matchup_table(week) -> pd.DataFrame:
+    '''The original row by row convert_league_matchup_table_to_df'''
+    with open(F'matchup_data/week{week}/week{week}_matchups.html') as fp:
+        soup = BeautifulSoup(fp, 'html.parser')
+    matchup_df = pd.DataFrame(columns=["Team1", "Team1 Score", "Team2", "Team2 Score", "Winner"])
+    matchup_data = soup.find_all('li')
+    for i in range(6):
+        team1 = matchup_data[i].find_all('a')[1].text
+        team1_score = float(matchup_data[i].find_all('div')[11].text)
+        team2 = matchup_data[i].find_all('a')[4].text
+        team2_score = float(matchup_data[i].find_all('div')[18].text)
+        winner = team2 if team2_score > team1_score else team1
+        matchup_df.loc[len(matchup_df)] = [team1, team1_score, team2, team2_score, winner]
+    return matchup_df
+
+
+def bench_frames():
+    '''Row by row DataFrame.loc appends vs building each frame in one step, over the whole season
+
+    the Week aggregates are timed against a warm columnar store (Week.player_df), which every aggregate shares
+    '''
+    weeks = load_weeks(WEEKS)
+    for week in weeks:
+        week.team_df
+    matchups = [matchup for week in weeks for matchup in week.league_matchups]
+    report("MatchUp.dataframe_for_csv",
+           timeit(lambda: [legacy_dataframe_for_csv(m) for m in matchups]), timeit(lambda: [m.dataframe_for_csv for m in matchups]))
+    report("Week.get_positions_pf",
+           timeit(lambda: [legacy_get_positions_pf(w) for w in weeks]), timeit(lambda: [w.get_positions_pf for w in weeks]))
+    report("Week.advanced_df",
+           timeit(lambda: [legacy_advanced_df(w) for w in weeks]), timeit(lambda: [w.advanced_df for w in weeks]))
+    report("Season.season_summary_df totals",
+           timeit(lambda: legacy_season_totals(weeks)), timeit(lambda: Season(weeks).totals))
+    report("convert_league_matchup_table_to_df",
+           timeit(lambda: [legacy_league_matchup_table(w) for w in WEEKS], repeat=1), timeit(lambda: [league_matchup_table(w) for w in WEEKS], repeat=1))
+
+
+def legacy_starting_points(roster: Roster) -> float:
+    '''The original Roster.starting_points, re-summed over the slot names on every access'''
+    total = 0
+    for pos in ["QB", "WR1", "WR2", "RB1", "RB2", "TE", "FLEX1", "FLEX2", "DEF"]:
+        total += roster.roster[pos].fan_pts
+    return total
+
+
+def bench_roster():
+    '''The team x week x matchup points lookups season_summary_df used to make, recomputed vs memoized'''
+    weeks = load_weeks(WEEKS)
+    teams = weeks[0].league_teams
+    matchups = [matchup for week in weeks for matchup in week.league_matchups]
+    def _legacy():
+        for team in teams:
+            for matchup in matchups:
+                if team in matchup.teams:
+                    legacy_starting_points(matchup.team1_roster) > legacy_starting_points(matchup.team2_roster)
+                    legacy_starting_points(matchup.team1_roster if team == matchup.team1_roster.team_name else matchup.team2_roster)
+    def _memoized():
+        for team in teams:
+            for matchup in matchups:
+                if team in matchup.teams:
+                    matchup.winner
+                    matchup.points_for(team)
+    report("season roster points lookups", timeit(_legacy), timeit(_memoized))
+
+
+def legacy_power_rankings(season: Season, df: pd.DataFrame) -> pd.DataFrame:
+    '''The original Season.get_power_rankings, rebuilding the points frames for every attribute'''
+    df_c_f = season.get_pf_ceiling_and_floor(last_n=5)
+    pf = season.get_points_for_df(last_n=5)
+    df["PF"] = pf["Points For"].apply(lambda x: sum(x))
+    df["PF PR"] = df["PF"] / max(df["PF"]) * 12 * 4
+    df_c_f["Ceiling PR"] = df_c_f["Ceiling"] / max(df_c_f["Ceiling"]) * 12 * 2
+    df_c_f["Floor PR"] = df_c_f["Floor"] / max(df_c_f["Floor"]) * 12
+    df["H2H Wins"] = df["H2H"].apply(lambda x: int(x.split("-")[0]))
+    df["H2H Wins PR"] = df["H2H Wins"] / max(df["H2H Wins"]) * 12 * 3
+    df = pd.merge(df, df_c_f, how="left", on="Team")
+    df["PR Total"] = df["PF PR"] + df["Ceiling PR"] + df["Floor PR"] + df["H2H Wins PR"]
+    df["Power Ranking"] = df["PR Total"].rank(ascending=False)
+    return df[["Team", "Power Ranking"]]
+
+
+def legacy_projected_record(df: pd.DataFrame, schedule: dict) -> pd.DataFrame:
+    '''The original Season.get_projected_record, a boolean mask lookup per scheduled matchup'''
+    df["proj w"] = df["Record"].apply(lambda x: int(x.split("-")[0]))
+    df["proj l"] = df["Record"].apply(lambda x: int(x.split("-")[1]))
+    for week in schedule.values():
+        for matchup in week:
+            if int(df[df['Team'] == matchup[0]]["Power Ranking"].iloc[0]) > int(df[df['Team'] == matchup[1]]["Power Ranking"].iloc[0]):
+                df.loc[df["Team"] == matchup[0], "proj l"] += 1
+                df.loc[df["Team"] == matchup[1], "proj w"] += 1
+            else:
+                df.loc[df["Team"] == matchup[0], "proj w"] += 1
+                df.loc[df["Team"] == matchup[1], "proj l"] += 1
+    df['Proj Record'] = [f"{a}-{b}" for a, b in zip(df["proj w"], df["proj l"])]
+    return df.drop(["proj w", "proj l"], axis=1)
+
+
+def bench_rankings():
+    '''Power rankings and projected record over a full 14 week schedule (every week replayed), pandas vs the array engine'''
+    weeks = load_weeks(WEEKS)
+    season = Season(weeks)
+    full_schedule = {f"week{week.week}": [matchup.teams for matchup in week.league_matchups] for week in weeks}
+    totals = season.team_totals
+    summary = pd.DataFrame({"Team": season.teams,
+                            "Record": [f"{int(w)}-{int(g - w)}" for w, g in zip(totals["w"], totals["games"])],
+                            "H2H": [f"{int(w)}-{int(l)}" for w, l in zip(totals["h2h w"], totals["h2h l"])]})
+    def _legacy():
+        df = pd.merge(legacy_power_rankings(season, summary.copy()), summary, how="left", on="Team")
+        legacy_projected_record(df, full_schedule)
+    def _engine():
+        season._rankings = None
+        record = summary["Record"].str.split("-", expand=True).astype(int).to_numpy()
+        projected_record(record[:, 0], record[:, 1], season.rankings_df["Power Ranking"].to_numpy(), schedule_matchups(full_schedule, season.registry))
+    report("power rankings + projected record", timeit(_legacy), timeit(_engine))
+
+
+def bench_playoff_odds():
+    '''100k simulated seasons of the remaining schedule and of a full 14 week schedule, both need to stay under 1s for the dashboard'''
+    weeks = load_weeks(WEEKS)
+    season = Season(weeks)
+    totals = season.team_totals
+    points = season.points().to_numpy()
+    ids = season.registry
+    full_schedule = {f"week{week.week}": [matchup.teams for matchup in week.league_matchups] for week in weeks}
+    for name, matchups, wins, pf in [("remaining schedule", schedule_matchups(schedule, ids, after_week=WEEKS[-1]), totals["w"], totals["pf"]),
+                                     ("full schedule", schedule_matchups(full_schedule, ids), totals["w"] * 0, totals["pf"] * 0)]:
+        elapsed = timeit(lambda: simulate_seeds(points, wins.to_numpy(), pf.to_numpy(), matchups))
+        print(f"{'playoff odds, ' + name:<40} {elapsed * 1000:>9.1f} ms   ({len(matchups)} games x 100,000 seasons)")
+
+
+def bench_lineup():
+    '''Optimal lineup (manager efficiency) of every roster in the season'''
+    weeks = load_weeks(WEEKS)
+    rosters = [roster for week in weeks for roster in week.league_rosters]
+    elapsed = timeit(lambda: [optimal_lineup(roster.players) for roster in rosters])
+    print(f"{'optimal lineup, every season roster':<40} {elapsed * 1000:>9.1f} ms   ({len(rosters)} rosters)")
+
+
+def legacy_extract_position(text) -> str:
+    try:
+        text = text.split(" - ")[1].split(" ")[0]
+    except:
+        pass
+    return text
+
+
+def legacy_extract_player_name(text) -> str:
+    text = str(text).split("-")[0].strip()
+    if text[-2:].upper() in team_abbrev:
+        player = text[:-2]
+    elif text[-3:].upper() in team_abbrev:
+        player = text[:-3]
+    else:
+        player = text
+    return player
+
+
+def legacy_extract_team(text) -> None | str:
+    text = str(text).split("-")[0].strip()
+    if text[-2:].upper() in team_abbrev:
+        return text[-2:].upper()
+    elif text[-3:].upper() in team_abbrev:
+        return text[-3:].upper()
+    else:
+        return None
+
+
+def player_cells() -> list:
+    '''Returns the raw Player cell of every roster row in the season, as the matchup parser reads them'''
+    cells = []
+    for week in WEEKS:
+        for i in MATCHUPS:
+            tree = etree.parse(f"matchup_data/week{week}/matchup_{i}.html", etree.HTMLParser(encoding="utf-8"))
+            for table_id in ROSTER_TABLE_IDS:
+                table = tree.find(f'.//table[@id="{table_id}"]')
+                for cols in (TEAM_1_COLS, TEAM_2_COLS):
+                    cells.extend(_table_to_df(table, cols)["Player"])
+    return cells
+
+
+def bench_players():
+    '''Name, team and position of every Player cell in the season, the three extract_* calls vs the fused parser'''
+    cells = player_cells()
+    def _legacy():
+        for cell in cells:
+            legacy_extract_player_name(cell), legacy_extract_team(cell), legacy_extract_position(cell)
+    def _cold():
+        _name_and_team.cache_clear()
+        for cell in cells:
+            parse_player(cell)
+    def _warm():
+        for cell in cells:
+            parse_player(cell)
+    report("player cells, cold cache", timeit(_legacy), timeit(_cold))
+    report("player cells, warm cache", timeit(_legacy), timeit(_warm))
+    print(f"{'':<40} {len(cells)} cells, {_name_and_team.cache_info().currsize} distinct name + team")
+
+
+def bench_boxplots():
+    '''The dashboard's five position boxplots, a px.box per position over the raw points vs one batched quartile pass'''
+    season = Season(load_weeks(WEEKS))
+    positions = ["All", "WR", "RB", "TE", "FLEX"]
+    def _legacy():
+        season._points = {}
+        for position in positions:
+            px.box(season.get_pf_data_for_boxplot_df(position), x="Team", y="Points For").to_json()
+    def _batched():
+        season._points = {}
+        season._box_summary = None
+        summary = season.box_summary()
+        for position in positions:
+            box_figure(summary[summary["position"] == position]).to_json()
+    report("position boxplots", timeit(_legacy), timeit(_batched))
+
+
+def bench_player_index():
+    '''A player's points per manager and an NFL team's starters in a week, masks over the season's columnar store vs its player index'''
+    season = Season(load_weeks(WEEKS))
+    df = season.player_df
+    def _scan():
+        started = ~df["slot"].isin(BENCH_LINEUP)
+        player = df[(df["player"] == "C. Kupp") & (df["nfl_team"] == "LAR") & started]
+        return player.groupby("team", observed=True)["fan_pts"].sum(), df[(df["nfl_team"] == "KC") & (df["week"] == 10) & started]
+    def _index():
+        index = season.player_index
+        return index.points_by_manager("C. Kupp", "LAR"), index.by_nfl_team("KC", week=10, started=True)
+    report("player lookups, one season", timeit(_scan), timeit(_index))
+
+
+BENCHMARKS = {
+    "parser": bench_parser,
+    "cache": bench_cache,
+    "frames": bench_frames,
+    "roster": bench_roster,
+    "rankings": bench_rankings,
+    "playoffs": bench_playoff_odds,
+    "lineup": bench_lineup,
+    "players": bench_players,
+    "boxplots": bench_boxplots,
+    "player_index": bench_player_index,
+}
+
+
+@contextmanager
+def working_directory(path):
+    '''The loaders read matchup_data/ relative to the working directory, so every synthetic season is run from its own'''
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(cwd)
+
+
+def run_suite(root: str, schedules: dict[int, dict], n_weeks: int) -> dict[str, float]:
+    '''Returns the best time (seconds) of every scenario, each summed over all the seasons under root'''
+    weeks = range(1, n_weeks + 1)
+    def _each_season(func):
+        def _run():
+            for year, remaining_schedule in schedules.items():
+                with working_directory(os.path.join(root, str(year))):
+                    func(remaining_schedule)
+        return _run
+    def _parse(remaining_schedule):
+        for week in weeks:
+            for path in matchup_paths(week):
+                parse_matchup_html(path)
+    def _load_cold(remaining_schedule):
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        load_season(weeks, workers=1)
+    def _load_warm(remaining_schedule):
+        load_season(weeks, workers=1)
+    seasons = {}
+    def _aggregate(remaining_schedule):
+        season = Season(load_season(weeks, workers=1), remaining_schedule=remaining_schedule)
+        season.season_summary_df, season.position_ranking_df
+        seasons[os.getcwd()] = season
+    def _rank(remaining_schedule):
+        season = seasons[os.getcwd()]
+        season._rankings = season._h2h = None
+        season.rankings_df, season.schedule_luck_df, season.playoff_odds(n_seasons=10_000, seed=0)
+    return {"parse": timeit(_each_season(_parse)),
+            "load, cold cache": timeit(_each_season(_load_cold)),
+            "load, warm cache": timeit(_each_season(_load_warm)),
+            "aggregate": timeit(_each_season(_aggregate)),
+            "rank": timeit(_each_season(_rank))}
+
+
+def suite(args) -> int:
+    '''Run the scenario suite, save or check the baseline, returns the exit code'''
+    config = f"{args.teams} teams x {args.weeks} weeks x {args.seasons} seasons"
+    root = args.root or tempfile.mkdtemp(prefix="sunnyvale_suite_")
+    try:
+        schedules = generate_league(root, args.teams, args.weeks, args.seasons, seed=args.seed)
+        results = run_suite(root, schedules, args.weeks)
+    finally:
+        if args.root is None:
+            shutil.rmtree(root, ignore_errors=True)
+    try:
+        with open(SUITE_BASELINE) as fp:
+            baselines = json.load(fp)
+    except FileNotFoundError:
+        baselines = {}
+    baseline = baselines.get(config, {})
+    regressed = []
+    print(config)
+    for scenario, elapsed in results.items():
+        line = f"{scenario:<40} {elapsed * 1000:>9.1f} ms"
+        if scenario in baseline:
+            ratio = elapsed / baseline[scenario]
+            line += f"   baseline {baseline[scenario] * 1000:>9.1f} ms   {ratio:>5.2f}x"
+            if ratio > 1 + args.tolerance:
+                line += "   REGRESSION"
+                regressed.append(scenario)
+        print(line)
+    if args.save_baseline:
+        baselines[config] = results
+        with open(SUITE_BASELINE, "w") as fp:
+            json.dump(baselines, fp, indent=1, sort_keys=True)
+        print(f"baseline saved to {SUITE_BASELINE}")
+    if args.check:
+        if not baseline:
+            print(f"no baseline for {config} in {SUITE_BASELINE}, run with --save-baseline first", file=sys.stderr)
+            return 1
+        if regressed:
+            print(f"{len(regressed)} scenario(s) more than {args.tolerance:.0%} slower than the baseline: {', '.join(regressed)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+def main():
+    argParser = argparse.ArgumentParser()
+    argParser.add_argument("benchmark", nargs="*", help=f"benchmarks to run ({', '.join(BENCHMARKS)}), default all")
+    argParser.add_argument("--suite", action="store_true", help="run the scenario suite over a synthetic league instead")
+    argParser.add_argument("--teams", type=int, default=12, help="suite: teams in the league")
+    argParser.add_argument("--weeks", type=int, default=14, help="suite: weeks per season")
+    argParser.add_argument("--seasons", type=int, default=1, help="suite: number of seasons")
+    argParser.add_argument("--seed", type=int, default=0, help="suite: seed of the synthetic league")
+    argParser.add_argument("--root", help="suite: write the league here and keep it, a temporary directory by default")
+    argParser.add_argument("--save-baseline", action="store_true", help=f"suite: save the results to {SUITE_BASELINE}")
+    argParser.add_argument("--check", action="store_true", help="suite: exit 1 if a scenario is slower than the baseline")
+    argParser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE, help="suite: allowed slowdown, 0.25 = 25%%")
+    args = argParser.parse_args()
+    for name in args.benchmark:
+        if name not in BENCHMARKS:
+            argParser.error(f"unknown benchmark {name}")
+    warnings.simplefilter("ignore")
+    if args.suite:
+        return suite(args)
+    for name in args.benchmark or BENCHMARKS:
+        BENCHMARKS[name]()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+'''
+Pre-aggregated boxplots
+
+The quartiles, whiskers and outliers of every team are computed up front for every position at
+once (Season.box_summary), so a figure only carries 5 numbers per team plus its outliers instead
+of every weekly score and plotly has nothing left to compute in the browser.
+'''
+
+# whiskers reach the furthest score within this many IQRs of the box, same as plotly's default
+WHISKER_IQR = 1.5
+
+
+def box_stats(points: np.ndarray) -> dict[str, np.ndarray]:
+    '''Returns q1, median, q3, lowerfence, upperfence and mean over the last axis of a (... x weeks) points array
+
+    weeks without a score (nan) are skipped, the quartiles are linearly interpolated
+    '''
+    with np.errstate(invalid="ignore"):
+        q1, median, q3 = np.nanpercentile(points, [25, 50, 75], axis=-1)
+        iqr = q3 - q1
+        inside = (points >= (q1 - WHISKER_IQR * iqr)[..., None]) & (points <= (q3 + WHISKER_IQR * iqr)[..., None])
+        return {"q1": q1, "median": median, "q3": q3,
+                "lowerfence": np.nanmin(np.where(inside, points, np.nan), axis=-1),
+                "upperfence": np.nanmax(np.where(inside, points, np.nan), axis=-1),
+                "mean": np.nanmean(points, axis=-1)}
+
+
+def box_figure(summary: pd.DataFrame) -> go.Figure:
+    '''Returns the boxplot of one position from its rows of Season.box_summary'''
+    fig = go.Figure(go.Box(x=summary["Team"], q1=summary["q1"], median=summary["median"], q3=summary["q3"],
+                           lowerfence=summary["lowerfence"], upperfence=summary["upperfence"], mean=summary["mean"],
+                           name="Points For", boxpoints=False, marker={"color": "#636efa"}, showlegend=False))
+    outliers = summary[["Team", "outliers"]].explode("outliers").dropna()
+    if not outliers.empty:
+        fig.add_trace(go.Scatter(x=outliers["Team"], y=outliers["outliers"].astype(float), mode="markers",
+                                 marker={"color": "#636efa"}, name="Outliers", showlegend=False))
+    fig.update_layout(xaxis_title="Team", yaxis_title="Points For")
+    return fig
@@ -1,74 +1,225 @@
-from bs4 import BeautifulSoup
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
+import glob
+import hashlib
+import json
 import os
+import re
+import sys
 import argparse
-from fantasy_objects import Roster, MatchUp
+from fantasy_objects import MatchUp, Week
+from league_db import LEAGUE_DB, add_week, connect
+from matchup_parser import SCOREBOARD_COLUMNS, parse_matchup_html, parse_scoreboard_html
+from profiling import count, timed
+from utils import SEASON
 
+'''
+Converts the Yahoo html in matchup_data/week{N} to csv's
+
+python convert_html_to_csv.py 5                   # a single week
+python convert_html_to_csv.py --weeks 1-3,7 -j 4  # a range of weeks over 4 worker processes
+python convert_html_to_csv.py --all --force       # rebuild every week, e.g. after a parser fix
+
+matchup_data/manifest.json keeps the hash of the html every csv was built from, a csv is only
+rebuilt when its html changed (or CONVERTER_VERSION was bumped).
+'''
+
+# bump whenever the csv output changes so every csv is rebuilt on the next run
+CONVERTER_VERSION = 4
+MANIFEST_PATH = "matchup_data/manifest.json"
+LEAGUE_CSV = "matchup.csv"
+
+def league_matchup_table(week) -> pd.DataFrame:
+    '''Parse week{WEEK}_matchups.html into a summary of all the league matchups, raises if it can't be parsed'''
+    return parse_scoreboard_html(source_path(week))
+
+@timed("convert_league_matchup_table_to_df")
 def convert_league_matchup_table_to_df(week) -> None | pd.DataFrame:
-    '''convert week{WEEK}_matchups.html to a user friendly csv that shows all the league matchups as a summary'''
+    '''convert week{WEEK}_matchups.html to a user friendly csv that shows all the league matchups as a summary
+
+    the converted matchup.csv is read instead when it is up to date, see csv_up_to_date
+    '''
     try:
-        with open(F'matchup_data/week{week}/week{week}_matchups.html') as fp:
-            soup = BeautifulSoup(fp, 'html.parser')
-
-        matchup_df = pd.DataFrame(columns=["Team1", "Team1 Score", "Team2", "Team2 Score", "Winner"])
-        matchup_data = soup.find_all('li')
-        for i in range(6):
-            team1 = matchup_data[i].find_all('a')[1].text
-            team1_score = float(matchup_data[i].find_all('div')[11].text)
-            team2 = matchup_data[i].find_all('a')[4].text
-            team2_score = float(matchup_data[i].find_all('div')[18].text)
-            winner = team2 if team2_score > team1_score else team1
-            row = [team1, team1_score, team2, team2_score, winner]
-            matchup_df.loc[len(matchup_df)] = row
-        return matchup_df
+        if csv_up_to_date(week):
+            count("league csv hits")
+            return pd.read_csv(output_path(week), index_col=0, dtype=SCOREBOARD_COLUMNS)
+        count("league csv misses")
+        return league_matchup_table(week)
     except:
         print("issue creating df for week ", week)
         return
         
 
-def convert_detailed_matchup_to_df(week, i) -> None | pd.DataFrame:
-    '''covert each matchup (matchup_{i}.html) to a user friendly csv table'''
+def convert_detailed_matchup_to_df(week, i) -> None | MatchUp:
+    '''covert each matchup (matchup_{i}.html) to a MatchUp, see matchup_parser.parse_matchup_html'''
     try:
-        with open(F'matchup_data/week{week}/matchup_{i}.html') as fp:
-            soup = BeautifulSoup(fp, 'html.parser')
-        matchup_header = soup.find("section", {"id": "matchup-header"})
-        # (TODO) This is fragile... fix!
-        if week < 6:
-            team1 = matchup_header.find_all('div')[6].text
-            team2 = matchup_header.find_all('div')[19].text
-        else:
-            team1 = matchup_header.find_all('div')[5].text
-            team2 = matchup_header.find_all('div')[17].text
-        matchup_df = pd.read_html(f'matchup_data/week{week}/matchup_{i}.html')
-        team_1_roster = Roster(team1, matchup_df[1].iloc[:,1:4], matchup_df[2].iloc[:,1:4])
-        team_2_cols = ["Player.1", "Proj.1", "Fan Pts.1"]
-        team_2_roster = Roster(team2, matchup_df[1][team_2_cols], matchup_df[2][team_2_cols])
-        matchup = MatchUp(team_1_roster, team_2_roster)
-        return matchup
+        return parse_matchup_html(f'matchup_data/week{week}/matchup_{i}.html')
     except:
         print("issue creating df for week", week, " matchup", i)
         return
 
+def source_path(week, i=None) -> str:
+    '''Returns the html for matchup i of a week, i=None being the league matchup table'''
+    return f"matchup_data/week{week}/week{week}_matchups.html" if i is None else f"matchup_data/week{week}/matchup_{i}.html"
+
+def matchup_numbers(week) -> list[int]:
+    '''Returns 1..N for the matchup_{i}.html's of a week, N the highest one there, so only a gap below it shows up as missing'''
+    found = [int(re.search(r"matchup_(\d+)\.html$", path).group(1)) for path in glob.glob(f"matchup_data/week{week}/matchup_*.html")]
+    return list(range(1, max(found, default=0) + 1))
+
+def output_path(week, i=None) -> str:
+    '''Returns the csv for matchup i of a week, i=None being the league matchup table'''
+    return f"matchup_data/week{week}/{LEAGUE_CSV}" if i is None else f"matchup_data/week{week}/matchup_{i}.csv"
+
+def parse_weeks(value: str) -> list[int]:
+    '''Parse a week list like "1-14" or "1,3,5-7"'''
+    weeks = []
+    for part in value.split(","):
+        start, _, end = part.partition("-")
+        weeks.extend(range(int(start), int(end or start) + 1))
+    return weeks
+
+def available_weeks() -> list[int]:
+    '''Returns every week that has a matchup_data/week{N} directory'''
+    return sorted(int(re.search(r"(\d+)$", path).group(1)) for path in glob.glob("matchup_data/week*") if os.path.isdir(path))
+
+def file_hash(path) -> str:
+    '''Returns the sha256 of a file's contents'''
+    with open(path, "rb") as fp:
+        return hashlib.sha256(fp.read()).hexdigest()
+
+def load_manifest() -> dict:
+    '''Returns the manifest, {csv path: {"source": html hash, "version": CONVERTER_VERSION}}'''
+    try:
+        with open(MANIFEST_PATH) as fp:
+            return json.load(fp)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_manifest(manifest: dict):
+    # write then rename so an interrupted run never leaves a half written manifest
+    with open(f"{MANIFEST_PATH}.tmp", "w") as fp:
+        json.dump(manifest, fp, indent=1, sort_keys=True)
+    os.replace(f"{MANIFEST_PATH}.tmp", MANIFEST_PATH)
+
+def csv_up_to_date(week, i=None, manifest: None | dict = None) -> bool:
+    '''Check if a csv can be used in place of its html, it has to be in the manifest with the html's current hash
+
+    a csv without its html is used as is, it's the only copy left
+    '''
+    output = output_path(week, i)
+    if not os.path.exists(output):
+        return False
+    if not os.path.exists(source_path(week, i)):
+        return True
+    manifest = load_manifest() if manifest is None else manifest
+    return manifest.get(output) == {"source": file_hash(source_path(week, i)), "version": CONVERTER_VERSION}
+
+def convert_file(week, i=None, write=True) -> None | MatchUp:
+    '''Convert a single html to its csv, i=None being the league matchup table, raises on failure
+
+    returns the parsed MatchUp of a matchup html, write=False only parses it
+    '''
+    if i is None:
+        df = league_matchup_table(week)
+        matchup = None
+    else:
+        matchup = parse_matchup_html(source_path(week, i))
+        df = matchup.dataframe_for_csv if write else None
+    if write:
+        df.to_csv(output_path(week, i))
+    return matchup
+
+def convert_weeks(weeks, jobs=None, force=False, matchups: None | dict[tuple[int, int], MatchUp] = None) -> dict[str, str]:
+    '''Convert every html of the given weeks whose csv is missing or out of date, over jobs worker processes
+
+    Returns {html path: error} for every file that failed, the manifest is updated for the rest.
+    When a matchups dict is given every matchup html is parsed, up to date or not, and its MatchUp
+    is put in it by (week, i)
+    '''
+    manifest = load_manifest()
+    errors = {}
+    tasks = []
+    unchanged = 0
+    for week in weeks:
+        for i in [None] + matchup_numbers(week):
+            source = source_path(week, i)
+            if not os.path.exists(source):
+                errors[source] = "html not available"
+                continue
+            if not force and csv_up_to_date(week, i, manifest):
+                unchanged += 1
+                if matchups is not None and i is not None:
+                    tasks.append((week, i, None))
+            else:
+                tasks.append((week, i, {"source": file_hash(source), "version": CONVERTER_VERSION}))
+    converted = 0
+    if tasks:
+        jobs = min(jobs or os.cpu_count() or 1, len(tasks))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(convert_file, week, i, entry is not None) for week, i, entry in tasks]
+            for (week, i, entry), future in zip(tasks, futures):
+                error = future.exception()
+                if error is not None:
+                    errors[source_path(week, i)] = f"{type(error).__name__}: {error}"
+                    continue
+                if entry is not None:
+                    manifest[output_path(week, i)] = entry
+                    converted += 1
+                if matchups is not None and i is not None:
+                    matchups[(week, i)] = future.result()
+        save_manifest(manifest)
+    print(f"{converted} converted, {unchanged} unchanged, {len(errors)} failed")
+    return errors
+
+def update_league_db(weeks, matchups: dict[tuple[int, int], MatchUp], year=SEASON, path=LEAGUE_DB) -> dict[str, str]:
+    '''Add (or replace) the given weeks in the league database from the MatchUps convert_weeks parsed, see league_db.py
+
+    a week with a matchup that couldn't be parsed is left out, returns {week directory: error} for those
+    '''
+    errors = {}
+    added = 0
+    with connect(path) as con:
+        for week in weeks:
+            numbers = [i for i in matchup_numbers(week) if os.path.exists(source_path(week, i))]
+            missing = [i for i in numbers if (week, i) not in matchups]
+            if missing:
+                errors[f"matchup_data/week{week}"] = f"not added to {path}, matchup(s) {missing} failed to parse"
+                continue
+            try:
+                add_week(con, year, Week([matchups[(week, i)] for i in numbers], week))
+                added += 1
+            except Exception as e:
+                errors[f"matchup_data/week{week}"] = f"not added to {path}, {type(e).__name__}: {e}"
+    print(f"{added} weeks added to {path}, {len(errors)} failed")
+    return errors
+
 def main():
     argParser = argparse.ArgumentParser()
-    argParser.add_argument("week", type=int, help="NFL Week")
+    argParser.add_argument("week", type=int, nargs="?", help="NFL Week")
+    argParser.add_argument("--weeks", type=parse_weeks, help="weeks to convert, e.g. 1-14 or 1,3,5-7")
+    argParser.add_argument("--all", action="store_true", help="convert every week in matchup_data")
+    argParser.add_argument("-j", "--jobs", type=int, help="number of worker processes, defaults to the number of cpus")
+    argParser.add_argument("--force", action="store_true", help="rebuild every csv, even if its html hasn't changed")
+    argParser.add_argument("--db", nargs="?", const=LEAGUE_DB, help="also add the weeks to this league database, see league_db.py")
+    argParser.add_argument("--year", type=int, default=SEASON, help="season the weeks are added to the league database as")
     args = argParser.parse_args()
-    if os.path.exists(f"matchup_data/week{args.week}/matchups.csv"):
-        print(f"csv for matchups already exists")
+    if args.all:
+        weeks = available_weeks()
+    elif args.weeks:
+        weeks = args.weeks
+    elif args.week is not None:
+        weeks = [args.week]
     else:
-        matchup_df = convert_league_matchup_table_to_df(args.week)
-        matchup_df.to_csv(f"matchup_data/week{args.week}/matchup.csv")
+        argParser.error("give a week, --weeks or --all")
 
-    for i in range(1,7):
-        if os.path.exists(f"matchup_data/week{args.week}/matchup_{i}.csv"):
-            print(f"csv for week {args.week} matchup {i} already exists")
-        else:
-            try:
-                matchup = convert_detailed_matchup_to_df(args.week, i)
-                combined_df = matchup.dataframe_for_csv
-                combined_df.to_csv(f"matchup_data/week{args.week}/matchup_{i}.csv")
-            except:
-                print(f"Week {args.week} matchup {i} html not available")
+    matchups = {} if args.db else None
+    errors = convert_weeks(weeks, jobs=args.jobs, force=args.force, matchups=matchups)
+    if args.db:
+        errors.update(update_league_db(weeks, matchups, args.year, args.db))
+    for path, error in errors.items():
+        print(f"{path}: {error}", file=sys.stderr)
+    return 1 if errors else 0
     
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
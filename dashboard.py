@@ -1,20 +1,29 @@
 import streamlit as st
-from convert_html_to_csv import convert_league_matchup_table_to_df, convert_detailed_matchup_to_df
-from fantasy_objects import Season, Week
-import plotly.express as px
+from convert_html_to_csv import available_weeks, convert_league_matchup_table_to_df
+from fantasy_objects import Season
+from live import DROP_DIR, LiveScoring, start_live
+from season_loader import LazyWeeks
+from teams import TeamRegistry
+from utils import team_aliases
+from boxplots import box_figure
+from season_cache import week_fingerprint
 import pandas as pd
-
-WEEK = 14
-
-def get_weeks(week) -> list[Week]:
-    '''Returns all the week data up to a given week'''
-    weeks: list[Week] = []
-    for i in range(1,week):
-        matchups = []
-        for j in range(1,7):
-            matchups.append(convert_detailed_matchup_to_df(i, j))
-        weeks.append(Week(matchups, i))
-    return weeks
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import profiling
+from profiling import timed_block
+
+# the latest week in matchup_data/, see archive.py for past seasons
+WEEK = max(available_weeks())
+BOXPLOT_POSITIONS = ["All", "WR", "RB", "TE", "FLEX"]
+
+def get_weeks(week) -> LazyWeeks:
+    '''Returns all the week data up to (and including) a given week, every week is only loaded once it's used'''
+    return LazyWeeks(range(1,week+1))
 
 def get_teams_from_league_summary(league_summary: pd.DataFrame):
     '''Returns all the teams from a league dataframe'''
@@ -22,24 +31,82 @@ def get_teams_from_league_summary(league_summary: pd.DataFrame):
     right_teams = league_summary["Team2"].tolist()
     return left_teams + right_teams
 
-def boxplot(position="All"):
-    '''Writes a boxplot to streamlit app for a given position'''
-    df = season.get_pf_data_for_boxplot_df(position)
-    st.write(f"{position} 'Points For' Boxplot")
-    fig = px.box(df, x='Team', y='Points For')
-    st.plotly_chart(fig, key=f"{position} Points For")
+def season_version(number_of_weeks) -> str:
+    '''Returns a hash of the source html of every week, it changes whenever a week is added or re-downloaded'''
+    fingerprints = [week_fingerprint(week) for week in range(1, number_of_weeks+1)]
+    return hashlib.sha256(json.dumps(fingerprints, sort_keys=True).encode()).hexdigest()
+
+@st.cache_data(max_entries=4*len(BOXPLOT_POSITIONS))
+def _boxplot_json(version, position, _season: Season) -> str:
+    # the season itself isn't hashed, version stands in for it
+    return box_figure(_season.box_summary().query("position == @position")).to_json()
+
+def boxplot(position="All", version=None):
+    '''Writes a boxplot to streamlit app for a given position, the quartiles are computed server side for every position at once'''
+    with timed_block(f"render {position} boxplot"):
+        st.write(f"{position} 'Points For' Boxplot")
+        fig = json.loads(_boxplot_json(version, position, season))
+        st.plotly_chart(fig, key=f"{position} Points For")
 
-@st.cache_data
+@st.cache_resource
 def load_data(number_of_weeks):
+    # cache_resource keeps the one LazyWeeks (and the weeks it has loaded) across reruns instead of pickling a copy
     return get_weeks(number_of_weeks)
 
+@st.cache_data(max_entries=WEEK)
+def _league_summary(week, html_mtime):
+    return convert_league_matchup_table_to_df(week)
+
+def league_summary(week) -> pd.DataFrame:
+    '''Returns the league matchup table for a week, cached until its html changes'''
+    try:
+        html_mtime = os.path.getmtime(f"matchup_data/week{week}/week{week}_matchups.html")
+    except FileNotFoundError:
+        html_mtime = None
+    return _league_summary(week, html_mtime)
+
 def get_team_name(name):
     '''team members change names over the season causing mismatches in stats, this function returns the most commonly used name from a team
 
-    Another idea is to move to managers instead of team names, but then we have a problem with Eric.
-    
-    (TODO) NICK
+    names are linked to a team by their Yahoo team number (or utils.team_aliases), see teams.TeamRegistry
     '''
+    registry = TeamRegistry.from_weeks(weeks, aliases=team_aliases)
+    return registry.name(registry[name])
+
+@st.cache_resource
+def live_scoring(week) -> LiveScoring:
+    '''One watcher per server process, polling the drop directory from a background thread'''
+    live = start_live(week)
+    threading.Thread(target=asyncio.run, args=(live.watch(),), daemon=True).start()
+    return live
+
+@st.fragment(run_every=1)
+def live_panel(live: LiveScoring):
+    '''Re-renders every second, only this panel, from whatever the watcher last applied'''
+    update = live.latest
+    st.dataframe(live.week.advanced_df, hide_index=True)
+    if update is not None:
+        st.caption(f"Matchup {update.matchup} updated, {len(update.changes)} players changed, applied in {update.elapsed * 1000:.0f} ms")
+        st.dataframe(update.changes, hide_index=True)
+
+def parse_args():
+    '''streamlit run dashboard.py -- --profile [path], turns on profiling.py and dumps the profile after every run'''
+    argParser = argparse.ArgumentParser()
+    argParser.add_argument("--profile", nargs="?", const=profiling.DEFAULT_PROFILE_PATH, help="write a timing profile to this json")
+    args, _ = argParser.parse_known_args()
+    return args
+
+def diagnostics():
+    '''Hidden sidebar panel with the profile of the session so far, only shown when profiling is on'''
+    profile = profiling.stats()
+    with st.sidebar.expander("Diagnostics", expanded=False):
+        timers = pd.DataFrame.from_dict(profile["timers"], orient="index").sort_values(by="total_ms", ascending=False)
+        st.dataframe(timers)
+        st.dataframe(pd.Series(profile["counters"], name="count"))
+
+args = parse_args()
+if args.profile:
+    profiling.enable()
 
 st.set_page_config(page_title="Sunnyvale Dashboard", page_icon=":football:", layout="wide")
 
@@ -50,46 +117,68 @@ st.markdown(md)
 # Create for Week
 st.sidebar.header("Week")
 week_list = ["All"] + [f"Week {x}" for x in range(1,WEEK+1)]
+# snapshots of the week being played, see live.py
+if os.path.isdir(DROP_DIR) and any(name.endswith(".html") for name in os.listdir(DROP_DIR)):
+    week_list.append("Live")
 week_str = st.sidebar.selectbox("Pick your Week", week_list, index=0)
 try:    
     week = int(week_str[4:])
 except:
     week = week_str
 
-weeks = load_data(len(week_list))
+weeks = load_data(WEEK)
 
-if week == "All":
+if week == "Live":
+    st.subheader(f"Week {WEEK + 1} Live", divider=True)
+    st.write("Refreshed as new matchup snapshots are dropped in, only the changed matchup is re-parsed")
+    live_panel(live_scoring(WEEK + 1))
+elif week == "All":
     st.header("League Summary")
     st.write("Data for all weeks shown below, select a week from the left pane to dive deeper into a specific week")
     st.write("- **H2H**: Record if you played every person every week \n - **Power Rankings**: Team power rankings are based on a proprietary calculation that encompasses all the dynamics that make a great fantasy team \n - **PaP**: The average Points above Projected a team scores every week\n - **Manager Efficiency**: What you scored divided by the potential points you could have scored if you would have played the best players every week\n - **Proj Record**: Your record based on your power ranking and the remaining schedule")
     season = Season(weeks)
-    st.dataframe(season.season_summary_df, hide_index=True)
+    with timed_block("render season summary"):
+        st.dataframe(season.season_summary_df, hide_index=True)
     st.caption("- :fire: / :snowflake:: One of the three top/lowest scorers the last three weeks\n - -p: clinched playoffs")
+    st.header("Playoff Odds")
+    st.write("Chance (%) of making the playoffs and of every seed, from 100,000 simulations of the remaining schedule using each team's weekly scores so far")
+    with timed_block("render playoff odds"):
+        st.dataframe(season.playoff_odds(), hide_index=True)
+    st.header("Schedule Luck")
+    st.write("- **All-Play**: Record if you played every person every week \n - **Exp W**: The wins you'd expect from your weekly all-play record \n - **Luck**: Wins above (or below) expected \n - **SOS**: Strength of schedule, the average all-play win % of the opponents you played")
+    with timed_block("render schedule luck"):
+        st.dataframe(season.schedule_luck_df, hide_index=True)
     st.header("Position Rankings")
     st.write("Scoring of each position compared to other league members")
-    st.dataframe(season.position_ranking_df, hide_index=True)
+    with timed_block("render position rankings"):
+        st.dataframe(season.position_ranking_df, hide_index=True)
     st.subheader("Boxplots")
     st.write("A boxplot representation of the points scored per week for a given position")
-    boxplot()
-    boxplot("WR")
-    boxplot("RB")
-    boxplot("TE")
-    boxplot("FLEX")
+    version = season_version(WEEK)
+    for position in BOXPLOT_POSITIONS:
+        boxplot(position, version)
 else:
     st.subheader(f"Week {week}", divider=True)
     st.subheader("League Summary")
-    league_summary = convert_league_matchup_table_to_df(week)
-    st.write(league_summary)
+    with timed_block("render league summary"):
+        st.write(league_summary(week))
 
     st.subheader("Advanced Analytics")
-    st.markdown("- H2H: Record if you played every person this week \n - Manager Efficiency: TODO")
+    st.markdown("- H2H: Record if you played every person this week \n - Manager Efficiency: What you scored divided by the points of the best lineup you could have started this week")
 
-    league = weeks[week-1]
-    df = league.advanced_df
-    st.dataframe(df, hide_index=True)
+    with timed_block("render advanced analytics"):
+        league = weeks[week-1]
+        df = league.advanced_df
+        st.dataframe(df, hide_index=True)
     st.subheader("Position Rankings")
     st.write("Scoring of each position compared to other league members")
-    st.dataframe(league.get_position_ranks, hide_index=True)
+    with timed_block("render week position rankings"):
+        st.dataframe(league.get_position_ranks, hide_index=True)
+
+if profiling.enabled():
+    diagnostics()
+    if args.profile:
+        profiling.dump(args.profile)
 
 
     
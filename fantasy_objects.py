@@ -1,5 +1,15 @@
-from utils import extract_player_name, extract_position, extract_team, manager_eff, schedule
+from utils import parse_player, schedule, team_aliases
+import bisect
+from profiling import count, timed
+import numpy as np
 import pandas as pd
+from boxplots import box_stats
+from lineup import efficiency, optimal_lineup, optimal_points
+from h2h import all_play_pct, all_play_records, expected_wins, h2h_matrix, strength_of_schedule
+from player_index import PlayerIndex
+from playoff_odds import PLAYOFF_SPOTS, simulate_seeds, standings_order
+from rankings import pf_ceiling_floor, power_ranking_scores, power_rankings, projected_record, schedule_matchups
+from teams import TeamRegistry
 
 '''
 This file contains all the objects used, the nesting structure is as follows:
@@ -7,19 +17,59 @@ This file contains all the objects used, the nesting structure is as follows:
 Season contains a list of Week's -> Season = list[Week]
 Week contains a list of Roster's -> Week = list[Roster]
 Roster contains a list of Player's -> Roster = list[Player]
+
+Every Week (and Season) is also flattened into a columnar store, player_df, a long dataframe with
+one row per roster slot: |week|matchup|team|team_key|slot|player|position|nfl_team|proj|fan_pts|
+The league aggregates are computed from it with groupby's, the objects above are a view of the same data.
 '''
 
+STARTING_LINEUP = ["QB", "WR1", "WR2", "RB1", "RB2", "TE", "FLEX1", "FLEX2", "DEF"]
+BENCH_LINEUP = ["BN1", "BN2", "BN3", "BN4", "BN5", "BN6", "BN7", "BN8"]
+# every roster slot in table order, Roster.players is indexed the same way
+ROSTER_SLOTS = STARTING_LINEUP + BENCH_LINEUP
+# the position a starting slot counts towards, e.g. WR1 -> WR, FLEX2 -> FLEX
+SLOT_POSITION = {slot: slot.rstrip("12") for slot in STARTING_LINEUP}
+PLAYER_COLUMNS = ["week", "matchup", "team", "team_key", "slot", "player", "position", "nfl_team", "proj", "fan_pts"]
+# positions tracked week by week in Season.points, "All" being the full starting lineup
+POINTS_POSITIONS = ["All", "QB", "WR", "RB", "TE", "FLEX", "DEF"]
+# running season totals kept by Season, summed from Week.team_df
+TOTAL_COLUMNS = ["w", "games", "pf", "pa", "pap", "h2h w", "h2h l", "h2h t", "optimal"]
+
+def categorize_player_df(df: pd.DataFrame) -> pd.DataFrame:
+    '''Apply the columnar store dtypes, categorical labels and float points'''
+    df = df.astype({"week": "int16", "matchup": "int8", "team": "category", "team_key": "Int16", "player": "category",
+                    "position": "category", "nfl_team": "category"})
+    df["slot"] = pd.Categorical(df["slot"], categories=ROSTER_SLOTS)
+    df["proj"] = pd.to_numeric(df["proj"], errors="coerce")
+    df["fan_pts"] = pd.to_numeric(df["fan_pts"], errors="coerce")
+    return df
+
+def slots_for_position(position: str) -> list[str]:
+    '''Returns the starting slots that count towards a position, "All" being every starting slot'''
+    return [slot for slot in STARTING_LINEUP if position == "All" or SLOT_POSITION[slot] == position]
+
 class Player:
     '''Placeholder for a Player class to be used with the to be created Roster class
     
     This class is only representative of a Player during the week specified.
     '''
+    __slots__ = ("name", "position", "fan_pts", "proj_pts", "team")
+
     def __init__(self, name_position_team:str, fan_pts:float, proj_pts:float):
-        self.name = extract_player_name(name_position_team)
-        self.position = extract_position(name_position_team)
+        self.name, self.team, self.position = parse_player(name_position_team)
         self.fan_pts = fan_pts
         self.proj_pts = proj_pts
-        self.team = extract_team(name_position_team)
+
+    @classmethod
+    def from_fields(cls, name: str, position: str, team: None | str, fan_pts: float, proj_pts: float):
+        '''Build a Player from already extracted fields (e.g. a cached row) instead of Yahoo player html'''
+        player = cls.__new__(cls)
+        player.name = name
+        player.position = position
+        player.fan_pts = fan_pts
+        player.proj_pts = proj_pts
+        player.team = team
+        return player
 
     @property
     def is_flex(self) -> bool:
@@ -42,95 +92,95 @@ class Player:
     def __str__(self):
         return f"{self.name}, {self.position}, {self.team}"
 
+def _to_points(value) -> float:
+    '''Yahoo shows "–" instead of points for a player on bye (or an empty slot), those count as 0'''
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
 class Roster:
-    '''A given teams Roster and their stats for a particular week, constructed from html'''
-    def __init__(self, team_name: str, starting_df: pd.DataFrame, bench_df: pd.DataFrame):
+    '''A given teams Roster and their stats for a particular week, constructed from html
+
+    The players are kept in ROSTER_SLOTS order (QB, WR1, ..., DEF, BN1, ..., BN8) and, since they
+    don't change once the Roster is built, the point totals are computed once up front.
+    '''
+    __slots__ = ("team_name", "team_key", "players", "starting_points", "bench_points", "net_points", "_position_points", "_optimal_lineup")
+
+    @timed("Roster.__init__")
+    def __init__(self, team_name: str, starting_df: pd.DataFrame, bench_df: pd.DataFrame, team_key: None | int = None):
         '''df's column must be in the following order:
         |Player|Proj|Fan Pts|
+
+        the first 9 rows of starting_df fill the starting slots and the first 8 rows of bench_df the bench,
+        team_key is the Yahoo team number, which stays the same when a team is renamed
         '''
-        roster_key = {
-            "QB" : 0,
-            "WR1" : 1,
-            "WR2" : 2,
-            "RB1" : 3,
-            "RB2" : 4,
-            "TE" : 5,
-            "FLEX1" : 6,
-            "FLEX2" : 7,
-            "DEF" : 8,
-            "BN1" : 0,
-            "BN2" : 1,
-            "BN3" : 2,
-            "BN4" : 3,
-            "BN5" : 4,
-            "BN6" : 5,
-            "BN7" : 6,
-            "BN8" : 7
-        }
-        self.roster: dict[str, Player] = dict.fromkeys(list(roster_key.keys()))
-        for k, v in roster_key.items():
-            # (TODO) This is sketchy, there has to be a better way to do this...
-            try:
-                self.roster[k] = Player(name_position_team=starting_df.iloc[v,0], fan_pts=starting_df.iloc[v,2], proj_pts=starting_df.iloc[v,1])
-            except:
-                self.roster[k] = Player(name_position_team=bench_df.iloc[v,0], fan_pts=bench_df.iloc[v,2], proj_pts=bench_df.iloc[v,1])
+        rows = starting_df.iloc[:len(STARTING_LINEUP), :3].values.tolist() + bench_df.iloc[:len(BENCH_LINEUP), :3].values.tolist()
+        if len(rows) != len(ROSTER_SLOTS):
+            raise ValueError(f"{team_name} has {len(rows)} roster rows, expected {len(ROSTER_SLOTS)}")
+        players = [Player(name_position_team=player, fan_pts=_to_points(fan_pts), proj_pts=_to_points(proj_pts)) for player, proj_pts, fan_pts in rows]
+        count("players built", len(players))
+        self._set_players(team_name, players, team_key)
+
+    @classmethod
+    def from_players(cls, team_name: str, roster: dict[str, Player], team_key: None | int = None):
+        '''Build a Roster from Players that are already keyed by roster slot (QB, WR1, ..., BN8)'''
+        instance = cls.__new__(cls)
+        instance._set_players(team_name, [roster[slot] for slot in ROSTER_SLOTS], team_key)
+        return instance
+
+    def _set_players(self, team_name: str, players: list[Player], team_key: None | int):
+        '''Store the players and total up their points, summed in slot order'''
         self.team_name = team_name
-        self.pf_rank = None
-        self.h2h_record: list[int] = [0,0]
+        self.team_key = team_key
+        self.players = players
+        self._optimal_lineup = None
+        self._position_points = dict.fromkeys(POINTS_POSITIONS[1:], 0)
+        starting, net = 0, 0
+        for slot, player in zip(STARTING_LINEUP, players):
+            self._position_points[SLOT_POSITION[slot]] += player.fan_pts
+            starting += player.fan_pts
+            net += player.net_points
+        bench = 0
+        for player in players[len(STARTING_LINEUP):]:
+            bench += player.fan_pts
+        self.starting_points = starting
+        self.bench_points = bench
+        # the points the starting lineup scored above (or below) projected
+        self.net_points = net
+
+    @property
+    def roster(self) -> dict[str, Player]:
+        '''Returns the players keyed by roster slot'''
+        return dict(zip(ROSTER_SLOTS, self.players))
     
     def position_points(self, position) -> float:
         '''Return the rosters starting position points based on a position
         
-        position options: QB, WR, RB, TE, FLEX
+        position options: All, QB, WR, RB, TE, FLEX, DEF
         '''
-        starting_lineup = ["QB", "WR1", "WR2", "RB1", "RB2", "TE", "FLEX1", "FLEX2", "DEF"]
-        total = 0
         if position == "All":
-            for pos in starting_lineup:
-                total += self.roster[pos].fan_pts
-        else:
-            for pos in starting_lineup:
-                if pos[:2] == position or pos[:-1] == position:
-                    total += self.roster[pos].fan_pts
-        return total
+            return self.starting_points
+        return self._position_points.get(position, 0)
 
-    
     @property
-    def starting_points(self) -> float:
-        '''Return the rosters starting points for scored'''
-        starting_lineup = ["QB", "WR1", "WR2", "RB1", "RB2", "TE", "FLEX1", "FLEX2", "DEF"]
-        total = 0
-        for pos in starting_lineup:
-            total += self.roster[pos].fan_pts
-        return total
+    def optimal_lineup(self) -> dict[str, Player]:
+        '''Returns the best lineup that could have been started from all 17 players, keyed by starting slot'''
+        if self._optimal_lineup is None:
+            self._optimal_lineup = optimal_lineup(self.players)
+        return self._optimal_lineup
 
     @property
-    def bench_points(self) -> float:
-        '''Return the rosters bench points for scored'''
-        bench_lineup = ["BN1", "BN2", "BN3", "BN4", "BN5", "BN6", "BN7", "BN8"]
-        total = 0
-        for pos in bench_lineup:
-            total += self.roster[pos].fan_pts
-        return total
-    
-    @property
-    def net_points(self):
-        '''Returns the net points your starting lineup scores above (or below) projected'''
-        starting_lineup = ["QB", "WR1", "WR2", "RB1", "RB2", "TE", "FLEX1", "FLEX2", "DEF"]
-        net = 0
-        for pos in starting_lineup:
-            net += self.roster[pos].net_points
-        return net
+    def optimal_points(self) -> float:
+        '''Returns the points the optimal lineup would have scored'''
+        return sum(player.fan_pts for player in self.optimal_lineup.values())
 
-
-    def manager_eff(self):
-        # NICK THIS IS WHERE YOU WORK YOUR MAGIC
-        return
+    def manager_eff(self) -> float:
+        '''Returns the starting points divided by the points of the optimal lineup'''
+        return efficiency(self.starting_points, self.optimal_points)
 
     def __str__(self):
-        for key in self.roster:
-            print(self.roster[key])
-        return
+        return "\n".join(str(player) for player in self.players)
 
 class MatchUp:
     def __init__(self, team1_roster: Roster, team2_roster: Roster):
@@ -167,43 +217,67 @@ class MatchUp:
             return self.team1_roster.net_points
         else:
             return self.team2_roster.net_points
-        
-    def h2h_record(self, team) -> list[int]:
-        '''Returns a team's head-to-head record against all Rosters'''
-        if team == self.team1_roster.team_name:
-            return self.team1_roster.h2h_record
-        else:
-            return self.team2_roster.h2h_record
 
     @property
     def dataframe_for_csv(self) -> pd.DataFrame:
         '''Returns a dataframe that is easily exported to a csv'''
         columns = [self.team1_roster.team_name, "Position", "Fan Pts", "Roster Position", "Fan Pts.1", "Position.1", self.team2_roster.team_name]
-        starting_matchup_df = pd.DataFrame(columns=columns)
-        bench_matchup_df = pd.DataFrame(columns=columns)
-        roster_positions = ["QB", "WR", "WR", "RB", "RB", "W/R/T", "W/R/T", "TE", "DEF", "Total"]
-        for pos in range(len(roster_positions)):
-            if roster_positions[pos] == "Total":
-                row = [None, None, self.team1_roster.starting_points, roster_positions[pos], self.team2_roster.starting_points, None, None]
-            else:
-                team_1_player = list(self.team1_roster.roster.values())[pos]
-                team_2_player = list(self.team2_roster.roster.values())[pos]
-                row = [team_1_player.name, team_1_player.position, team_1_player.fan_pts, roster_positions[pos], team_2_player.fan_pts, team_2_player.position, team_2_player.name]
-            starting_matchup_df.loc[len(starting_matchup_df)] = row
-        for i in range(8):
-            team_1_player = list(self.team1_roster.roster.values())[i+9]
-            team_2_player = list(self.team2_roster.roster.values())[i+9]
-            row = [team_1_player.name, team_1_player.position, team_1_player.fan_pts, roster_positions[pos], team_2_player.fan_pts, team_2_player.position, team_2_player.name]
-            bench_matchup_df.loc[len(bench_matchup_df)] = row
-        bench_matchup_df.loc[len(bench_matchup_df)] = [None, None, self.team1_roster.bench_points, "Total", self.team2_roster.bench_points, None, None]
-        combined_df = pd.concat([starting_matchup_df, bench_matchup_df], ignore_index=True)
-        return combined_df
+        roster_positions = ["QB", "WR", "WR", "RB", "RB", "W/R/T", "W/R/T", "TE", "DEF"]
+        team_1_players = self.team1_roster.players
+        team_2_players = self.team2_roster.players
+        rows = []
+        for roster_position, team_1_player, team_2_player in zip(roster_positions, team_1_players, team_2_players):
+            rows.append([team_1_player.name, team_1_player.position, team_1_player.fan_pts, roster_position, team_2_player.fan_pts, team_2_player.position, team_2_player.name])
+        rows.append([None, None, self.team1_roster.starting_points, "Total", self.team2_roster.starting_points, None, None])
+        # the bench rows have always been written with the "Total" roster position, kept so the csv's stay comparable
+        for team_1_player, team_2_player in zip(team_1_players[9:], team_2_players[9:]):
+            rows.append([team_1_player.name, team_1_player.position, team_1_player.fan_pts, "Total", team_2_player.fan_pts, team_2_player.position, team_2_player.name])
+        rows.append([None, None, self.team1_roster.bench_points, "Total", self.team2_roster.bench_points, None, None])
+        return pd.DataFrame(rows, columns=columns)
     
+def matchups_from_player_df(df: pd.DataFrame) -> list[MatchUp]:
+    '''Rebuild the MatchUps of a week from its player_df'''
+    df = df.copy()
+    for col in ["team", "player", "position", "nfl_team"]:
+        df[col] = df[col].astype(object).where(df[col].notna(), None)
+    matchups = []
+    for _, matchup_df in df.groupby("matchup", sort=True):
+        rosters = []
+        for team, roster_df in matchup_df.groupby("team", sort=False, observed=True):
+            team_key = roster_df["team_key"].iloc[0]
+            roster = {}
+            for slot, name, position, nfl_team, proj, fan_pts in zip(roster_df["slot"], roster_df["player"], roster_df["position"],
+                                                                    roster_df["nfl_team"], roster_df["proj"], roster_df["fan_pts"]):
+                roster[slot] = Player.from_fields(name, position, nfl_team, fan_pts, proj)
+            rosters.append(Roster.from_players(team, roster, None if pd.isna(team_key) else int(team_key)))
+        matchups.append(MatchUp(rosters[0], rosters[1]))
+    return matchups
+
 class Week:
     '''A class that stores league matchups for a given week'''
-    def __init__(self, league_matchups:list[MatchUp], week: int):
-        self.league_matchups: list[MatchUp] = league_matchups
-        self.league_rosters: list[Roster] = self.flatten_matchups
+    def __init__(self, league_matchups: None | list[MatchUp], week: int, player_df: None | pd.DataFrame = None):
+        '''league_matchups can be None when player_df is given (e.g. read from the season cache), the
+        MatchUps are then only built from player_df the first time they are used
+        '''
+        if league_matchups is None and player_df is None:
+            raise ValueError(f"week {week} needs its league_matchups or its player_df")
+        self._league_matchups = league_matchups
+        self._league_rosters = None
+        self.week = week
+        self._player_df = player_df
+        self._team_df = None
+
+    @property
+    def league_matchups(self) -> list[MatchUp]:
+        if self._league_matchups is None:
+            self._league_matchups = matchups_from_player_df(self._player_df)
+        return self._league_matchups
+
+    @property
+    def league_rosters(self) -> list[Roster]:
+        if self._league_rosters is None:
+            self._league_rosters = self.flatten_matchups
+        return self._league_rosters
     
     @property
     def flatten_matchups(self) -> list[Roster]:
@@ -214,22 +288,84 @@ class Week:
             roster_list.append(matchup.team2_roster)
         return roster_list
 
+    @property
+    @timed("Week.player_df")
+    def player_df(self) -> pd.DataFrame:
+        '''Returns the columnar store for the week, one row per roster slot'''
+        if self._player_df is None:
+            columns = {col: [] for col in PLAYER_COLUMNS}
+            for i, matchup in enumerate(self.league_matchups, start=1):
+                for roster in [matchup.team1_roster, matchup.team2_roster]:
+                    for slot, player in zip(ROSTER_SLOTS, roster.players):
+                        columns["matchup"].append(i)
+                        columns["team"].append(roster.team_name)
+                        columns["team_key"].append(roster.team_key)
+                        columns["slot"].append(slot)
+                        columns["player"].append(player.name)
+                        columns["position"].append(player.position)
+                        columns["nfl_team"].append(player.team)
+                        columns["proj"].append(player.proj_pts)
+                        columns["fan_pts"].append(player.fan_pts)
+            columns["week"] = [self.week] * len(columns["slot"])
+            self._player_df = categorize_player_df(pd.DataFrame(columns))
+            count("player rows built", len(self._player_df))
+        return self._player_df
+
+    @property
+    @timed("Week.team_df")
+    def team_df(self) -> pd.DataFrame:
+        '''Returns one row per team for the week
+
+        |team|team_key|matchup|opponent|opponent_key|pf|pa|pap|win|h2h w|h2h l|h2h t|optimal| followed by the starting
+        points of every position, team_key being the Yahoo team number (NA when the page has none)
+        '''
+        if self._team_df is None:
+            # rosters are in league_rosters order and every one starts over at the QB slot, so a roster
+            # is found by where its slots are, not by its name (two snapshots can share a name)
+            slot_codes = self.player_df["slot"].cat.codes.to_numpy().astype(int)
+            roster_codes = np.cumsum(np.diff(slot_codes, prepend=len(ROSTER_SLOTS)) <= 0)
+            starting = self.player_df["slot"].isin(STARTING_LINEUP).to_numpy()
+            df = self.player_df[starting]
+            _, first_rows, team_codes = np.unique(roster_codes[starting], return_index=True, return_inverse=True)
+            teams = df["team"].astype(str).to_numpy()[first_rows]
+            team_keys = df["team_key"].array[first_rows]
+            fan_pts = df["fan_pts"].to_numpy()
+            # accumulate in roster order (QB, WR1, ..., DEF) so the totals match Roster.starting_points
+            positions = np.zeros((len(teams), len(POINTS_POSITIONS)))
+            position_codes = np.array([POINTS_POSITIONS.index(SLOT_POSITION[slot]) for slot in STARTING_LINEUP])
+            np.add.at(positions, (team_codes, position_codes[df["slot"].cat.codes.to_numpy()]), fan_pts)
+            pf = np.zeros(len(teams))
+            np.add.at(pf, team_codes, fan_pts)
+            pap = np.zeros(len(teams))
+            np.add.at(pap, team_codes, fan_pts - df["proj"].to_numpy())
+            matchup = df["matchup"].to_numpy()[first_rows]
+            # team1 is the first roster of its matchup, team2 the one right after it
+            team2 = np.r_[False, matchup[1:] == matchup[:-1]]
+            opponent = np.where(team2, np.arange(len(teams)) - 1, np.arange(len(teams)) + 1)
+            pa = pf[opponent]
+            h2h_w, h2h_l, h2h_t = (record[:, 0] for record in all_play_records(h2h_matrix(pf)))
+            # the optimal lineup of every roster straight from its rows, its Players are never built
+            rosters = [[] for _ in teams]
+            for code, player in zip(roster_codes - 1, self.player_df[["position", "fan_pts"]].itertuples(index=False)):
+                rosters[code].append(player)
+            df = pd.DataFrame({"team": teams, "team_key": team_keys, "matchup": matchup, "opponent": teams[opponent],
+                               "opponent_key": team_keys[opponent], "pf": pf, "pa": pa, "pap": pap,
+                               # a tie goes to team2, same as MatchUp.winner
+                               "win": (pf > pa) | (team2 & (pf == pa)),
+                               "h2h w": h2h_w, "h2h l": h2h_l, "h2h t": h2h_t,
+                               "optimal": [optimal_points(players) for players in rosters]})
+            for i, position in enumerate(POINTS_POSITIONS[1:], start=1):
+                df[position] = positions[:, i]
+            self._team_df = df
+        return self._team_df
+
     @property
     def get_positions_pf(self):
         keys = ["QB", "RB", "WR", "TE", "FLEX"]
-        pos_dict = dict.fromkeys(keys)
-        columns = ["Team"] + keys
-        df = pd.DataFrame(columns=columns)
-        for roster in self.league_rosters:
-            team = roster.team_name
-            for pos in keys:
-                pts = roster.position_points(pos)
-                pos_dict[pos] = pts
-            row = [team, pos_dict["QB"], pos_dict["RB"], pos_dict["WR"], pos_dict["TE"], pos_dict["FLEX"]]
-            df.loc[len(df)] = row
-        return df
+        return self.team_df[["team"] + keys].rename(columns={"team": "Team"})
     
     @property
+    @timed("Week.get_position_ranks")
     def get_position_ranks(self):
         df = self.get_positions_pf
         positions = df.columns.tolist()[1:]
@@ -248,32 +384,27 @@ class Week:
         return teams
 
     @property
-    def get_pf_rankings(self):
-        '''Populates the current object with points for rankings'''
-        def _get_score(roster: Roster):
-            return roster.starting_points
-        self.league_rosters.sort(key=_get_score, reverse=True)
-        for i in range(len(self.league_rosters)):
-            self.league_rosters[i].pf_rank = i + 1
-        return self
+    def get_pf_rankings(self) -> pd.DataFrame:
+        '''Returns every team's points for and rank for the week, highest PF first'''
+        df = self.team_df.sort_values(by="pf", ascending=False, kind="stable")
+        return pd.DataFrame({"Team": df["team"].values, "PF": df["pf"].values, "PF Rank": np.arange(1, len(df) + 1)})
     
     @property
-    def get_h2h_record(self):
-        '''Populates the current object with h2h record'''
-        self.get_pf_rankings
-        for i in range(len(self.league_rosters)):
-            self.league_rosters[i].h2h_record = [11-i, i]
-        return self
+    def get_h2h_record(self) -> pd.DataFrame:
+        '''Returns every team's head-to-head record against all other teams for the week, see h2h.py'''
+        df = self.team_df
+        return pd.DataFrame({"Team": df["team"].values, "W": df["h2h w"].values, "L": df["h2h l"].values, "T": df["h2h t"].values})
     
     @property
+    @timed("Week.advanced_df")
     def advanced_df(self) -> pd.DataFrame:
-        '''Returns a dataframe with head-to-head and manager efficiency data'''
-        self.get_h2h_record
-        advanced_df = pd.DataFrame(columns=["Team", "PF", "H2H", "Manager Eff"])
-        for roster in self.league_rosters:
-            row = [roster.team_name, roster.starting_points, roster.h2h_record, "Nick"]
-            advanced_df.loc[len(advanced_df)] = row
-        return advanced_df
+        '''Returns a dataframe with head-to-head and manager efficiency data, highest PF first'''
+        df = self.team_df.sort_values(by="pf", ascending=False, kind="stable")
+        return pd.DataFrame({"Team": df["team"].values,
+                             "PF": df["pf"].values,
+                             # a tie only shows up when there was one
+                             "H2H": [[w, l, t] if t else [w, l] for w, l, t in zip(df["h2h w"], df["h2h l"], df["h2h t"])],
+                             "Manager Eff": [f"{round(efficiency(pf, optimal) * 100,2)}%" for pf, optimal in zip(df["pf"], df["optimal"])]})
     
     @property
     def winners(self) -> list[str]:
@@ -284,130 +415,234 @@ class Week:
         return winners
 
 class Season:
-    def __init__(self, season_summary: list[Week]):
-        '''Season long stats for every Roster for every Week'''
-        self.season_summary = season_summary
-        self.teams = self.season_summary[0].league_teams
+    @timed("Season.__init__")
+    def __init__(self, season_summary: list[Week], remaining_schedule: None | dict[str, list[list[str]]] = None):
+        '''Season long stats for every Roster for every Week
 
+        teams are identified by their id in self.registry, every team x week matrix (and the totals) is indexed by it,
+        remaining_schedule is keyed like utils.schedule (the default) and is what the projections play out
+        '''
+        self.season_summary = list(season_summary)
+        self.schedule = schedule if remaining_schedule is None else remaining_schedule
+        self.registry = TeamRegistry.from_weeks(self.season_summary, aliases=team_aliases)
+        self.totals = self._team_totals(pd.concat([week.team_df for week in self.season_summary]))
+        self._player_df = None
+        self._player_index = None
+        self._points = {}
+        self._box_summary = None
+        self._rankings = None
+        self._h2h = None
+
+    @property
+    def teams(self) -> list[str]:
+        '''Returns the name of every team, indexed by team id'''
+        return self.registry.names
+
+    def _team_totals(self, team_df: pd.DataFrame) -> pd.DataFrame:
+        '''Returns the running total columns summed per team id from one or more Week.team_df's'''
+        team_df = team_df.assign(w=team_df["win"], games=1, team=self.registry.ids(team_df["team"], team_df["team_key"]))
+        return team_df.groupby("team")[TOTAL_COLUMNS].sum().astype(float)
+
+    @timed("Season.append_week")
+    def append_week(self, week: Week):
+        '''Add a Week to the season, only that Week's stats are computed and added to the running totals
+
+        Appending a week that is already in the season replaces it, e.g. when the current week's scores are refreshed,
+        a week missing from the middle of the season is inserted in week order
+        '''
+        self.registry.add_week(week)
+        for i, existing in enumerate(self.season_summary):
+            if existing.week == week.week:
+                self.totals = self.totals.sub(self._team_totals(existing.team_df), fill_value=0)
+                self.season_summary[i] = week
+                break
+        else:
+            # a back-filled week goes in at its place, every last_n window counts on week order
+            bisect.insort(self.season_summary, week, key=lambda existing: existing.week)
+        self.totals = self.totals.add(self._team_totals(week.team_df), fill_value=0)
+        if self._player_index is not None:
+            self._player_index.add_week(week)
+        self._player_df = None
+        self._points = {}
+        self._box_summary = None
+        self._rankings = None
+        self._h2h = None
+
+    @property
+    def team_totals(self) -> pd.DataFrame:
+        '''Returns the running totals with one row per team id, 0 for a team that has no games yet'''
+        return self.totals.reindex(range(len(self.registry)), fill_value=0)
+
+    @property
+    @timed("Season.player_df")
+    def player_df(self) -> pd.DataFrame:
+        '''Returns the columnar store for the season, one row per roster slot per week'''
+        if self._player_df is None:
+            self._player_df = categorize_player_df(pd.concat([week.player_df for week in self.season_summary], ignore_index=True))
+        return self._player_df
+
+    @property
+    def player_index(self) -> PlayerIndex:
+        '''Returns every roster slot of the season indexed by player, NFL team and position, see player_index.py'''
+        if self._player_index is None:
+            self._player_index = PlayerIndex(self.season_summary)
+        return self._player_index
+
+    @timed("Season.load_points")
+    def _load_points(self):
+        '''Fills the points matrix of every position in one pass over the weeks'''
+        cube = np.full((len(POINTS_POSITIONS), len(self.registry), len(self.season_summary)), np.nan)
+        for i, week in enumerate(self.season_summary):
+            team_df = week.team_df
+            cube[:, self.registry.ids(team_df["team"], team_df["team_key"]), i] = team_df[["pf"] + POINTS_POSITIONS[1:]].to_numpy().T
+        columns = [week.week for week in self.season_summary]
+        self._points = {position: pd.DataFrame(cube[i], columns=columns) for i, position in enumerate(POINTS_POSITIONS)}
+
+    @timed("Season.points")
+    def points(self, position: str="All") -> pd.DataFrame:
+        '''Returns a team id x week matrix of the starting points scored by a position, "All" being the full lineup'''
+        if not self._points:
+            self._load_points()
+        return self._points[position]
+
+    @timed("Season.box_summary")
+    def box_summary(self) -> pd.DataFrame:
+        '''Returns the weekly points of every team and position boiled down to a boxplot, see boxplots.py
+
+        |position|Team|q1|median|q3|lowerfence|upperfence|mean|outliers|, one row per position and team, teams by name
+        '''
+        if self._box_summary is None:
+            if not self._points:
+                self._load_points()
+            cube = np.stack([self._points[position].to_numpy() for position in POINTS_POSITIONS])
+            stats = box_stats(cube)
+            outside = (cube < stats["lowerfence"][..., None]) | (cube > stats["upperfence"][..., None])
+            df = pd.DataFrame({"position": np.repeat(POINTS_POSITIONS, len(self.registry)),
+                               "Team": np.tile(np.array(self.teams, dtype=object), len(POINTS_POSITIONS)),
+                               **{stat: values.ravel() for stat, values in stats.items()},
+                               "outliers": [points[mask].tolist() for points, mask in zip(cube.reshape(-1, cube.shape[-1]), outside.reshape(-1, cube.shape[-1]))]})
+            # a team without a game yet has no box
+            self._box_summary = df.dropna(subset="median").sort_values(["position", "Team"], kind="stable").reset_index(drop=True)
+        return self._box_summary
+
+    def last_n_points(self, last_n=None) -> pd.DataFrame:
+        '''Returns the team id x week points matrix for the last n weeks, every week if last_n is None'''
+        df = self.points()
+        return df if last_n is None else df.iloc[:, -last_n:]
+
+    def _by_team_name(self, df: pd.DataFrame) -> pd.DataFrame:
+        '''Swap a team id index for the team names, sorted by name'''
+        return df.set_axis(self.teams, axis=0).sort_index()
+
+    @timed("Season.get_pf_data_for_boxplot_df")
     def get_pf_data_for_boxplot_df(self, position:str="All") -> pd.DataFrame:
         '''Returns a dataframe that is easily compatible with a boxplot'''
-        team_list = []
-        pf_list = []
-        for team in self.teams:
-            for i in range(len(self.season_summary)):
-                for roster in self.season_summary[i].league_rosters:
-                    if team == roster.team_name:
-                        team_list.append(team)
-                        if position == "All":
-                            pf_list.append(roster.starting_points)
-                        else:
-                            pf_list.append(roster.position_points(position))
-        df = pd.DataFrame({"Team" : team_list,
-                          "Points For" : pf_list})
+        pf = self.points(position).stack().dropna()
+        df = pd.DataFrame({"Team" : np.array(self.teams, dtype=object)[pf.index.get_level_values(0)],
+                          "Points For" : pf.values})
         return df
     
     def get_points_for_df(self, last_n=None):
         '''Returns a df that has the columns of Team and a list of points for'''
-        def _last_n_sum(list, l_n):
-            return list[-l_n:]
-        df = self.get_pf_data_for_boxplot_df()
-        df = df.groupby('Team')['Points For'].apply(list).reset_index(name='Points For')
-        if last_n is None:
-            return df
-        else:
-            df["Points For"] = df["Points For"].apply(lambda x: _last_n_sum(x, last_n))
-            return df
+        df = self._by_team_name(self.last_n_points(last_n))
+        return pd.DataFrame({"Team": df.index, "Points For": [row[~pd.isna(row)].tolist() for row in df.values]})
         
     def get_trending_team(self, fire=True):
         '''Returns the top 3 teams that have the highest PF the last 3 weeks if fire is True, else returns lowest 3 teams'''
-        def _extract_last_three(pf_list):
-            return sum(pf_list[-3:])
-        df = self.get_points_for_df()
-        df["L3"] = df["Points For"].apply(lambda x: _extract_last_three(x))
-        df = df.sort_values(by=["L3"], ascending=False)
-        team_list = df["Team"].tolist()
+        df = self._by_team_name(self.last_n_points(3)).sum(axis=1)
+        team_list = df.sort_values(ascending=False).index.tolist()
         if fire:
             return team_list[:3]
         else:
             return team_list[-3:]
 
             
+    @property
+    @timed("Season.rankings_df")
+    def rankings_df(self) -> pd.DataFrame:
+        '''Returns the power ranking attributes of every team, one row per team id'''
+        if self._rankings is None:
+            points = self.points().to_numpy()
+            h2h_wins = self.team_totals["h2h w"].to_numpy()
+            pf, ceiling, floor = pf_ceiling_floor(points)
+            scores = power_ranking_scores(points, h2h_wins)
+            self._rankings = pd.DataFrame({"Team": self.teams, "PF": pf, "Ceiling": ceiling, "Floor": floor,
+                                           "H2H Wins": h2h_wins, "PR Total": scores, "Power Ranking": power_rankings(scores)})
+        return self._rankings
+
+    @property
+    def h2h(self) -> np.ndarray:
+        '''Returns the team x team x week all-play results of the season, indexed by team id, see h2h.h2h_matrix'''
+        if self._h2h is None:
+            self._h2h = h2h_matrix(self.points().to_numpy())
+        return self._h2h
+
+    @property
+    def opponents(self) -> np.ndarray:
+        '''Returns a team x week matrix of every team's opponent id, -1 for a week without a matchup'''
+        opponents = np.full((len(self.registry), len(self.season_summary)), -1)
+        for j, week in enumerate(self.season_summary):
+            team_df = week.team_df
+            opponents[self.registry.ids(team_df["team"], team_df["team_key"]), j] = self.registry.ids(team_df["opponent"], team_df["opponent_key"])
+        return opponents
+
+    @property
+    @timed("Season.schedule_luck_df")
+    def schedule_luck_df(self) -> pd.DataFrame:
+        '''Returns every team's all-play record, expected wins, luck (wins above expected) and strength of schedule'''
+        wins, losses, ties = (record.sum(axis=1) for record in all_play_records(self.h2h))
+        expected = expected_wins(self.h2h)
+        actual = self.team_totals["w"].to_numpy()
+        df = pd.DataFrame({"Team": self.teams,
+                           "All-Play": [f"{w}-{l}-{t}" if t else f"{w}-{l}" for w, l, t in zip(wins, losses, ties)],
+                           "All-Play %": (all_play_pct(wins, losses, ties) * 100).round(1),
+                           "W": actual.astype(int),
+                           "Exp W": expected.round(2),
+                           "Luck": (actual - expected).round(2),
+                           "SOS": (strength_of_schedule(self.h2h, self.opponents) * 100).round(1)})
+        return df.sort_values(by="Luck", ascending=False)
+
     def get_power_rankings(self, df) -> pd.DataFrame:
-        '''
-        attributes
-        - PF = 1st (4pts * 11)
-        - H2H Wins = (2nd 3pts * 11)
-        - Floor = 4th (1pt * 11)
-        - Ceiling = 3rd (2pts * 11)
-        '''
-        def _remove_emoji(team):
-            if team[-1] == "🔥" or team[-1] == "❄️":
-                return team[:-1]
-            else:
-                return team
-        def _extract_h2h_wl(wl_str):
-            return int(wl_str.split("-")[0])
-        df_c_f = self.get_pf_ceiling_and_floor(last_n=5)
-        df["Team"] = df["Team"].apply(lambda x: _remove_emoji(x))
-        pf = self.get_points_for_df(last_n=5)
-        df["PF"] = pf["Points For"].apply(lambda x: sum(x))
-        df["PF PR"] = df["PF"] / max(df["PF"]) * 12 * 4
-        df_c_f["Ceiling PR"] = df_c_f["Ceiling"] / max(df_c_f["Ceiling"]) * 12 * 2
-        df_c_f["Floor PR"] = df_c_f["Floor"] / max(df_c_f["Floor"]) * 12
-        df["H2H Wins"] = df["H2H"].apply(lambda x: _extract_h2h_wl(x))
-        df["H2H Wins PR"] = df["H2H Wins"] / max(df["H2H Wins"]) * 12 * 3
-        df = pd.merge(df, df_c_f, how="left", on="Team")
-        df = df[["Team", "PF PR", "Ceiling PR", "Floor PR", "H2H Wins PR"]]
-        df["PR Total"] = df["PF PR"] + df["Ceiling PR"] + df["Floor PR"] + df["H2H Wins PR"]
-        df["Power Ranking"] = df["PR Total"].rank(ascending=False)
-        return df[["Team", "Power Ranking"]]
+        '''Returns the power ranking of every team in df, see rankings.power_ranking_scores for the attributes'''
+        rankings = self.rankings_df["Power Ranking"].to_numpy()
+        return pd.DataFrame({"Team": df["Team"].values, "Power Ranking": rankings[self.registry.ids(df["Team"])]})
 
     def get_position_rank(self, position) -> pd.DataFrame:
         '''Returns the rank a team is for a given position in the entire season'''
-        df = self.get_pf_data_for_boxplot_df(position)
-        df = df.groupby("Team").mean()
-        df = df.reset_index()
+        df = self._by_team_name(self.points(position)).mean(axis=1)
+        df = df.rename_axis("Team").reset_index(name="Points For")
         df[f"{position} Rank"] = df["Points For"].rank(ascending=False)
         return df[["Team", f"{position} Rank"]]
     
     def get_pf_ceiling_and_floor(self, last_n=None) -> pd.DataFrame:
         '''Returns the ceiling and floor of a team for the given season'''
-        df = self.get_points_for_df(last_n=last_n)
-        df["Ceiling"] = df["Points For"].apply(lambda x: max(x))
-        df["Floor"] = df["Points For"].apply(lambda x: min(x))
-        return df[["Team", "Ceiling", "Floor"]]
+        df = self._by_team_name(self.last_n_points(last_n))
+        return pd.DataFrame({"Team": df.index, "Ceiling": df.max(axis=1).values, "Floor": df.min(axis=1).values})
 
     def playoff_teams(self, summary: pd.DataFrame):
-        '''returns a list of current playoff teams'''
-        def _split(value, by, pos):
-            return value.split(by)[pos]
-        df = summary[["Team", "Record", "PF"]]
-        df["w"] = df["Record"].apply(lambda x: _split(x, "-", 0))
-        df["l"] = df["Record"].apply(lambda x: _split(x, "-", 1))
-        df = df.sort_values(by="w", ascending=False)
-        # check for ties
-        if df.iloc[3]['w'] == df.iloc[4]['w']:
-            if df.iloc[4]['w'] == df.iloc[5]['w']:
-                if df.iloc[5]['w'] == df.iloc[6]['w']:
-                    df = df.head(7)
-                else:
-                    df = df.head(6)
-            else:
-                df = df.head(5)
-        else:
-            df = df.head(4)
+        '''returns a list of current playoff teams, the most wins with PF breaking ties'''
+        wins = summary["Record"].str.split("-").str[0].astype(int).to_numpy()
+        order = standings_order(wins, summary["PF"].to_numpy())
+        return summary["Team"].to_numpy()[order[:PLAYOFF_SPOTS]].tolist()
 
-        tie_teams_low = df[df["w"] == df['w'].min()]
-        other = df[df["w"] != df['w'].min()]
-        remaining_spots = 4 - len(other)
-        tie_teams_low = tie_teams_low.sort_values(by="PF", ascending=False)
-        tie_teams_low = tie_teams_low.head(remaining_spots)
-        df = pd.concat([other, tie_teams_low])
+    @timed("Season.playoff_odds")
+    def playoff_odds(self, n_seasons=100_000, seed=None) -> pd.DataFrame:
+        '''Returns every team's chance (%) of making the playoffs and of every playoff seed
 
-        return df['Team'].tolist()
+        the rest of the schedule is simulated n_seasons times, see playoff_odds.simulate_seeds
+        '''
+        totals = self.team_totals
+        last_week = max(week.week for week in self.season_summary)
+        matchups = schedule_matchups(self.schedule, self.registry, after_week=last_week)
+        seeds = simulate_seeds(self.points().to_numpy(), totals["w"].to_numpy(), totals["pf"].to_numpy(),
+                               matchups, n_seasons=n_seasons, seed=seed) * 100
+        df = pd.DataFrame({"Team": self.teams, "Playoffs": seeds[:, :PLAYOFF_SPOTS].sum(axis=1).round(1)})
+        for i in range(PLAYOFF_SPOTS):
+            df[f"Seed {i + 1}"] = seeds[:, i].round(1)
+        return df.sort_values(by=["Playoffs", "Seed 1"], ascending=False)
 
-    
     @property
+    @timed("Season.position_ranking_df")
     def position_ranking_df(self) -> pd.DataFrame:
         '''Returns a dataframe of postiion rankings'''
         # CLEAN THIS UP
@@ -424,25 +659,20 @@ class Season:
         return df
 
     def get_projected_record(self, df: pd.DataFrame, remaining_games = 3):
-        def _extract_wins(wl_string):
-            return int(wl_string.split("-")[0])
-        def _extract_losses(wl_string):
-            return int(wl_string.split("-")[1])
-        df["proj w"] = df["Record"].apply(lambda x: _extract_wins(x))
-        df["proj l"] = df["Record"].apply(lambda x: _extract_losses(x))
-        for week in schedule.values():
-            for matchup in week:
-                if int(df[df['Team'] == matchup[0]]["Power Ranking"]) > int(df[df['Team'] == matchup[1]]["Power Ranking"]):
-                    df.loc[df["Team"] == matchup[0], "proj l"] += 1
-                    df.loc[df["Team"] == matchup[1], "proj w"] += 1
-                else:
-                    df.loc[df["Team"] == matchup[0], "proj w"] += 1
-                    df.loc[df["Team"] == matchup[1], "proj l"] += 1
-        df['Proj Record'] = [f"{a}-{b}" for a, b in zip(df["proj w"], df["proj l"])]
-        df.drop(["proj w", "proj l"], axis=1, inplace=True)
+        '''Adds the "Proj Record", every matchup left on the schedule won by the team with the better power ranking'''
+        ids = self.registry.ids(df["Team"])
+        record = df["Record"].str.split("-", expand=True).astype(int).to_numpy()
+        wins, losses = np.zeros(len(self.registry), dtype=int), np.zeros(len(self.registry), dtype=int)
+        rankings = np.full(len(self.registry), np.inf)
+        wins[ids], losses[ids], rankings[ids] = record[:, 0], record[:, 1], df["Power Ranking"].to_numpy()
+        last_week = max(week.week for week in self.season_summary)
+        matchups = schedule_matchups(self.schedule, self.registry, after_week=last_week)
+        wins, losses = projected_record(wins, losses, rankings, matchups)
+        df['Proj Record'] = [f"{wins[i]}-{losses[i]}" for i in ids]
         return df
     
     @property
+    @timed("Season.season_summary_df")
     def season_summary_df(self) -> pd.DataFrame:
         # (TODO) There has to be a better way to do this...
         def _add_fire(team_str, on_fire_list):
@@ -460,38 +690,19 @@ class Season:
                 return f"{team_str} -p"
             else:
                 return team_str
-        df = pd.DataFrame(columns=["Team", "Record", "PF", "PA", "H2H", "PaP", "Manager Eff"])
         on_fire_teams = self.get_trending_team(fire=True)
         snowflake_teams = self.get_trending_team(fire=False)
-        for team in self.teams:
-            w = 0
-            l = 0
-            pf = 0
-            pa = 0
-            h2hw = 0
-            h2hl = 0
-            pap = 0
-            
-            for i in range(len(self.season_summary)):
-                self.season_summary[i].get_h2h_record
-                for matchup in self.season_summary[i].league_matchups:
-                    if team in matchup.teams:
-                        man_eff = manager_eff[team]
-                        pa += matchup.points_against(team)
-                        pf += matchup.points_for(team)
-                        pap += matchup.point_above_projected(team)
-                        if matchup.winner == team:
-                            w += 1 
-                        else:
-                            l += 1
-                        h2h = matchup.h2h_record(team)
-                        h2hw += h2h[0]
-                        h2hl += h2h[1]
-            pap = round(pap / len(self.season_summary), 2)
-            row = [team, f"{w}-{l}", pf, pa, f"{h2hw}-{h2hl}", pap, f"{round(man_eff * 100,2)}%"]
-            df.loc[len(df)] = row
-        pr_df = self.get_power_rankings(df.copy())
-        df = pd.merge(pr_df, df, how="left", on="Team")
+        totals = self.team_totals
+        df = pd.DataFrame({
+            "Team": self.teams,
+            "Power Ranking": self.rankings_df["Power Ranking"].values,
+            "Record": [f"{int(w)}-{int(games - w)}" for w, games in zip(totals["w"], totals["games"])],
+            "PF": totals["pf"].values,
+            "PA": totals["pa"].values,
+            "H2H": [f"{int(w)}-{int(l)}-{int(t)}" if t else f"{int(w)}-{int(l)}" for w, l, t in zip(totals["h2h w"], totals["h2h l"], totals["h2h t"])],
+            "PaP": round(totals["pap"] / len(self.season_summary), 2).values,
+            "Manager Eff": [f"{round(efficiency(pf, optimal) * 100,2)}%" for pf, optimal in zip(totals["pf"], totals["optimal"])],
+        })
         df = self.get_projected_record(df)
         df["Team"] = df["Team"].apply(lambda x: _playoffs(x, ['Pitter Patter']))
         df["Team"] = df["Team"].apply(lambda x: _add_fire(x, on_fire_teams))
@@ -0,0 +1,58 @@
+import numpy as np
+
+'''
+Pairwise head-to-head (all-play) results
+
+h2h_matrix compares every team with every other team every week in one vectorized pass, the
+result is a team x team x week matrix with rows/columns indexed by team id (see teams.TeamRegistry).
+All-play records, expected wins, strength of schedule and schedule luck are all read from it,
+for any league size and with ties counted as ties.
+'''
+
+WIN, TIE, LOSS = 1, 0, -1
+
+
+def h2h_matrix(points: np.ndarray) -> np.ndarray:
+    '''Returns the (teams x teams x weeks) result of every team (row) against every other team (column)
+
+    points is a team x week matrix (or a single week of team points), a result is WIN, TIE or LOSS,
+    nan when either team has no score that week and on the diagonal
+    '''
+    points = np.asarray(points, dtype=float)
+    if points.ndim == 1:
+        points = points[:, None]
+    matrix = np.sign(points[:, None, :] - points[None, :, :])
+    teams = np.arange(len(points))
+    matrix[teams, teams, :] = np.nan
+    return matrix
+
+
+def all_play_records(matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    '''Returns the all-play wins, losses and ties of every team every week, (teams x weeks) each'''
+    return (matrix == WIN).sum(axis=1), (matrix == LOSS).sum(axis=1), (matrix == TIE).sum(axis=1)
+
+
+def all_play_pct(wins: np.ndarray, losses: np.ndarray, ties: np.ndarray) -> np.ndarray:
+    '''Returns the all-play win percentage, a tie counting as half a win, 0 without any games'''
+    games = wins + losses + ties
+    return np.divide(wins + ties / 2, games, out=np.zeros(np.shape(games)), where=games > 0)
+
+
+def expected_wins(matrix: np.ndarray) -> np.ndarray:
+    '''Returns every team's expected wins for the season, the sum of their weekly all-play win percentages
+
+    i.e. the wins a team would expect against a random opponent every week
+    '''
+    return all_play_pct(*all_play_records(matrix)).sum(axis=1)
+
+
+def strength_of_schedule(matrix: np.ndarray, opponents: np.ndarray) -> np.ndarray:
+    '''Returns the average season all-play win percentage of the opponents every team actually played
+
+    opponents is a team x week matrix of opponent team ids, -1 for a week without a matchup
+    '''
+    wins, losses, ties = (record.sum(axis=1) for record in all_play_records(matrix))
+    pct = all_play_pct(wins, losses, ties)
+    played = opponents >= 0
+    opponent_pct = np.where(played, pct[np.where(played, opponents, 0)], 0)
+    return np.divide(opponent_pct.sum(axis=1), played.sum(axis=1), out=np.zeros(len(opponents)), where=played.any(axis=1))
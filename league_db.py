@@ -0,0 +1,193 @@
+import argparse
+import sqlite3
+import pandas as pd
+from fantasy_objects import POINTS_POSITIONS, Week
+from rankings import CEILING_WEIGHT, FLOOR_WEIGHT, H2H_WEIGHT, PF_WEIGHT, RECENT_WEEKS
+from utils import SEASON
+
+'''
+Embedded SQL layer over the league, a single SQLite file (no server)
+
+weeks      one row per week          |year|week|matchups|
+matchups   one row per matchup       |year|week|matchup|team1_key|team2_key|team1_score|team2_score|winner_key|
+rosters    one row per team per week |year|week|team_key|team|matchup|opponent_key|pf|pa|pap|win|h2h_w|h2h_l|h2h_t|optimal|qb|wr|rb|te|flex|def|
+players    one row per roster slot   |year|week|team_key|slot|player|position|nfl_team|proj|fan_pts|
+
+A team is its Yahoo team number (team_key) within a season, the teams view gives the name it has
+used most. The season aggregates of fantasy_objects.Season are views on top, season_totals,
+power_rankings, position_ranks and season_summary, so a new league stat is a query, e.g.
+
+python league_db.py query "SELECT year, team, MAX(pf) FROM rosters GROUP BY year, team_key"
+python league_db.py summary 2024
+
+The converter fills it, python convert_html_to_csv.py --all --db [--year 2024]. Adding a week that is already
+in the database replaces it.
+'''
+
+LEAGUE_DB = "league.sqlite"
+# the positions tracked per team per week, columns qb, wr, ... of rosters
+POSITIONS = POINTS_POSITIONS[1:]
+_AVERAGES = ", ".join(f"AVG({position.lower()}) AS {position.lower()}" for position in POSITIONS)
+# ties get the average of their ranks, same as pandas' rank
+_RANKS = ", ".join(f"RANK() OVER (PARTITION BY year ORDER BY {position.lower()} DESC) "
+                   f"+ (COUNT(*) OVER (PARTITION BY year, {position.lower()}) - 1) / 2.0 AS \"{position} Rank\"" for position in POSITIONS)
+
+SCHEMA = f'''
+CREATE TABLE IF NOT EXISTS weeks (
+    year INTEGER NOT NULL, week INTEGER NOT NULL, matchups INTEGER NOT NULL,
+    PRIMARY KEY (year, week));
+CREATE TABLE IF NOT EXISTS matchups (
+    year INTEGER NOT NULL, week INTEGER NOT NULL, matchup INTEGER NOT NULL,
+    team1_key INTEGER NOT NULL, team2_key INTEGER NOT NULL, team1_score REAL, team2_score REAL, winner_key INTEGER,
+    PRIMARY KEY (year, week, matchup));
+CREATE TABLE IF NOT EXISTS rosters (
+    year INTEGER NOT NULL, week INTEGER NOT NULL, team_key INTEGER NOT NULL, team TEXT NOT NULL,
+    matchup INTEGER, opponent_key INTEGER, pf REAL, pa REAL, pap REAL, win INTEGER,
+    h2h_w INTEGER, h2h_l INTEGER, h2h_t INTEGER, optimal REAL,
+    qb REAL, wr REAL, rb REAL, te REAL, flex REAL, def REAL,
+    PRIMARY KEY (year, week, team_key));
+CREATE TABLE IF NOT EXISTS players (
+    year INTEGER NOT NULL, week INTEGER NOT NULL, team_key INTEGER NOT NULL, slot TEXT NOT NULL,
+    player TEXT, position TEXT, nfl_team TEXT, proj REAL, fan_pts REAL,
+    PRIMARY KEY (year, week, team_key, slot));
+
+CREATE INDEX IF NOT EXISTS rosters_team ON rosters (team_key, year, week);
+CREATE INDEX IF NOT EXISTS matchups_team1 ON matchups (team1_key, year, week);
+CREATE INDEX IF NOT EXISTS matchups_team2 ON matchups (team2_key, year, week);
+CREATE INDEX IF NOT EXISTS players_team ON players (team_key, year, week);
+CREATE INDEX IF NOT EXISTS players_player ON players (player, year, week);
+CREATE INDEX IF NOT EXISTS players_nfl_team ON players (nfl_team, year, week);
+
+-- the name a team has used most, the one it started using last on a tie (teams.TeamRegistry.name)
+CREATE VIEW IF NOT EXISTS teams AS
+SELECT year, team_key, team FROM (
+    SELECT year, team_key, team, ROW_NUMBER() OVER (PARTITION BY year, team_key ORDER BY COUNT(*) DESC, MIN(week) DESC) AS pick
+    FROM rosters GROUP BY year, team_key, team)
+WHERE pick = 1;
+
+CREATE VIEW IF NOT EXISTS season_totals AS
+SELECT year, team_key, COUNT(*) AS games, SUM(win) AS w, COUNT(*) - SUM(win) AS l, SUM(pf) AS pf, SUM(pa) AS pa,
+       SUM(pap) AS pap, SUM(h2h_w) AS h2h_w, SUM(h2h_l) AS h2h_l, SUM(h2h_t) AS h2h_t, SUM(optimal) AS optimal
+FROM rosters GROUP BY year, team_key;
+
+-- rankings.power_ranking_scores: PF, ceiling and floor of the last {RECENT_WEEKS} weeks and the season's H2H wins,
+-- each scaled so the league best gets weight points per team
+CREATE VIEW IF NOT EXISTS power_rankings AS
+WITH recent AS (
+    SELECT year, week FROM (SELECT year, week, ROW_NUMBER() OVER (PARTITION BY year ORDER BY week DESC) AS age FROM weeks)
+    WHERE age <= {RECENT_WEEKS}),
+attributes AS (
+    SELECT r.year, r.team_key, SUM(r.pf) AS pf, MAX(r.pf) AS ceiling, MIN(r.pf) AS floor
+    FROM rosters r JOIN recent USING (year, week) GROUP BY r.year, r.team_key),
+scores AS (
+    SELECT a.year, a.team_key, a.pf, a.ceiling, a.floor, t.h2h_w,
+           COUNT(*) OVER (PARTITION BY a.year) * (
+               a.pf / MAX(a.pf) OVER (PARTITION BY a.year) * {PF_WEIGHT}
+               + CAST(t.h2h_w AS REAL) / MAX(t.h2h_w) OVER (PARTITION BY a.year) * {H2H_WEIGHT}
+               + a.ceiling / MAX(a.ceiling) OVER (PARTITION BY a.year) * {CEILING_WEIGHT}
+               + a.floor / MAX(a.floor) OVER (PARTITION BY a.year) * {FLOOR_WEIGHT}) AS score
+    FROM attributes a JOIN season_totals t USING (year, team_key))
+SELECT year, team_key, pf AS "PF", ceiling AS "Ceiling", floor AS "Floor", h2h_w AS "H2H Wins", score AS "PR Total",
+       RANK() OVER (PARTITION BY year ORDER BY score DESC) + (COUNT(*) OVER (PARTITION BY year, score) - 1) / 2.0 AS "Power Ranking"
+FROM scores;
+
+CREATE VIEW IF NOT EXISTS position_ranks AS
+WITH averages AS (
+    SELECT year, team_key, {_AVERAGES}
+    FROM rosters GROUP BY year, team_key),
+ranks AS (
+    SELECT year, team_key, {_RANKS}
+    FROM averages)
+SELECT *, ROUND(("RB Rank" + "WR Rank" + "TE Rank" + "FLEX Rank") / 4, 2) AS "Avg Rank" FROM ranks;
+
+CREATE VIEW IF NOT EXISTS season_summary AS
+SELECT s.year, s.team_key, teams.team AS "Team", p."Power Ranking",
+       s.w || '-' || s.l AS "Record", s.pf AS "PF", s.pa AS "PA",
+       s.h2h_w || '-' || s.h2h_l || CASE WHEN s.h2h_t THEN '-' || s.h2h_t ELSE '' END AS "H2H",
+       ROUND(s.pap / w.weeks, 2) AS "PaP",
+       CASE WHEN s.optimal THEN ROUND(s.pf / s.optimal * 100, 2) ELSE 100.0 END AS "Manager Eff"
+FROM season_totals s
+JOIN teams USING (year, team_key)
+JOIN power_rankings p USING (year, team_key)
+JOIN (SELECT year, COUNT(*) AS weeks FROM weeks GROUP BY year) w USING (year);
+'''
+
+
+def connect(path=LEAGUE_DB) -> sqlite3.Connection:
+    '''Open (and create if needed) the league database'''
+    con = sqlite3.connect(path)
+    con.executescript(SCHEMA)
+    return con
+
+
+def _rows(df: pd.DataFrame) -> list[tuple]:
+    '''Returns the rows of a dataframe as plain python values, numpy scalars and NA's aren't sqlite types'''
+    return list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+
+
+def add_week(con: sqlite3.Connection, year: int, week: Week):
+    '''Add (or replace) a Week, in one transaction'''
+    if week.team_df["team_key"].isna().any():
+        raise ValueError(f"week {week.week} has a team without a Yahoo team number")
+    # team_df rows are team1 then team2 of every matchup
+    team_df = week.team_df.assign(year=year, week=week.week)
+    rosters = team_df[["year", "week", "team_key", "team", "matchup", "opponent_key", "pf", "pa", "pap", "win",
+                       "h2h w", "h2h l", "h2h t", "optimal"] + POSITIONS]
+    team1, team2 = team_df.iloc[::2].reset_index(drop=True), team_df.iloc[1::2].reset_index(drop=True)
+    matchups = pd.DataFrame({"year": year, "week": week.week, "matchup": team1["matchup"],
+                             "team1_key": team1["team_key"], "team2_key": team2["team_key"],
+                             "team1_score": team1["pf"], "team2_score": team2["pf"],
+                             "winner_key": team1["team_key"].where(team1["win"], team2["team_key"])})
+    player_df = week.player_df
+    players = pd.DataFrame({"year": year, "week": week.week, "team_key": player_df["team_key"],
+                            **{col: player_df[col].astype(object) for col in ["slot", "player", "position", "nfl_team"]},
+                            "proj": player_df["proj"], "fan_pts": player_df["fan_pts"]})
+    with con:
+        for table in ("weeks", "matchups", "rosters", "players"):
+            con.execute(f"DELETE FROM {table} WHERE year = ? AND week = ?", (year, week.week))
+        con.execute("INSERT INTO weeks VALUES (?, ?, ?)", (year, week.week, len(matchups)))
+        for table, df in (("matchups", matchups), ("rosters", rosters), ("players", players)):
+            con.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' * df.shape[1])})", _rows(df))
+
+
+def add_season(con: sqlite3.Connection, year: int, weeks: list[Week]):
+    for week in weeks:
+        add_week(con, year, week)
+
+
+def query(con: sqlite3.Connection, sql: str, params=()) -> pd.DataFrame:
+    '''Run any SELECT against the tables and views, returns the result as a dataframe'''
+    return pd.read_sql_query(sql, con, params=params)
+
+
+def season_summary(con: sqlite3.Connection, year=SEASON) -> pd.DataFrame:
+    '''Returns the SQL version of Season.season_summary_df, without the projected record and the emoji'''
+    return query(con, 'SELECT "Team", "Power Ranking", "Record", "PF", "PA", "H2H", "PaP", "Manager Eff" '
+                      'FROM season_summary WHERE year = ? ORDER BY "Power Ranking"', (year,))
+
+
+def position_ranking(con: sqlite3.Connection, year=SEASON) -> pd.DataFrame:
+    '''Returns the SQL version of Season.position_ranking_df'''
+    return query(con, 'SELECT teams.team AS "Team", "QB Rank", "RB Rank", "WR Rank", "TE Rank", "FLEX Rank", "Avg Rank" '
+                      'FROM position_ranks JOIN teams USING (year, team_key) WHERE year = ? ORDER BY "Team"', (year,))
+
+
+def main():
+    argParser = argparse.ArgumentParser()
+    argParser.add_argument("--db", default=LEAGUE_DB, help="league database")
+    commands = argParser.add_subparsers(dest="command", required=True)
+    sql = commands.add_parser("query", help="run a SELECT")
+    sql.add_argument("sql")
+    summary = commands.add_parser("summary", help="season summary and position ranks of a season")
+    summary.add_argument("year", type=int, nargs="?", default=SEASON)
+    args = argParser.parse_args()
+
+    with connect(args.db) as con:
+        if args.command == "query":
+            print(query(con, args.sql).to_string(index=False))
+        else:
+            print(season_summary(con, args.year).to_string(index=False))
+            print(position_ranking(con, args.year).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+from itertools import product
+
+'''
+Optimal lineup solver
+
+The best legal lineup (QB, WR, WR, RB, RB, TE, W/R/T, W/R/T, DEF) for any group of Players, e.g.
+the 17 players on a Roster. With single position players the dedicated slots can be filled
+greedily, the best QB, the best 2 WRs, etc., and the 2 FLEX slots then go to the best WR/RB/TE
+left over: swapping a better player into a dedicated slot never makes a lineup worse. A multi
+position player (e.g. "QB,TE") is tried at each of their positions, so only 2^k greedy passes
+are needed for k of them (almost always 0 or 1) instead of trying every permutation.
+'''
+
+# dedicated starting slots per position, in Roster slot order
+LINEUP_SLOTS = {"QB": ["QB"], "WR": ["WR1", "WR2"], "RB": ["RB1", "RB2"], "TE": ["TE"], "DEF": ["DEF"]}
+FLEX_SLOTS = ["FLEX1", "FLEX2"]
+FLEX_POSITIONS = ("WR", "RB", "TE")
+
+
+def eligible_positions(player) -> list[str]:
+    '''Returns the lineup positions a Player can fill, Yahoo lists multiple positions as "QB,TE"'''
+    return [position for position in str(player.position).split(",") if position in LINEUP_SLOTS]
+
+
+def _greedy_lineup(players: list, positions: list[str]) -> tuple[float, dict]:
+    '''Fill the lineup with every player locked to one position, players must be sorted best first'''
+    lineup = {}
+    filled = dict.fromkeys(LINEUP_SLOTS, 0)
+    flex = []
+    for player, position in zip(players, positions):
+        slots = LINEUP_SLOTS.get(position)
+        if slots is None:
+            continue
+        if filled[position] < len(slots):
+            lineup[slots[filled[position]]] = player
+            filled[position] += 1
+        elif position in FLEX_POSITIONS and len(flex) < len(FLEX_SLOTS):
+            lineup[FLEX_SLOTS[len(flex)]] = player
+            flex.append(player)
+    return sum(player.fan_pts for player in lineup.values()), lineup
+
+
+def optimal_lineup(players) -> dict:
+    '''Returns the highest scoring legal lineup as {slot: Player}
+
+    every slot with an eligible player is filled (a DEF with negative points still starts), slots that
+    can't be filled are left out
+    '''
+    players = sorted(players, key=lambda player: player.fan_pts, reverse=True)
+    choices = [eligible_positions(player) or [None] for player in players]
+    best_points, best_lineup = -float("inf"), {}
+    for positions in product(*choices):
+        points, lineup = _greedy_lineup(players, positions)
+        if points > best_points:
+            best_points, best_lineup = points, lineup
+    return best_lineup
+
+
+def optimal_points(players) -> float:
+    '''Returns the points the optimal lineup would have scored'''
+    return sum(player.fan_pts for player in optimal_lineup(players).values())
+
+
+def efficiency(actual: float, optimal: float) -> float:
+    '''Returns actual / optimal points, 1 when there were no points to score'''
+    return actual / optimal if optimal else 1.0
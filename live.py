@@ -0,0 +1,220 @@
+import argparse
+import asyncio
+import os
+import re
+import shutil
+import time
+import pandas as pd
+from fantasy_objects import ROSTER_SLOTS, MatchUp, Season, Week
+from matchup_parser import parse_matchup_html
+from profiling import count, timed
+from season_loader import load_season
+
+'''
+Live scoring from matchup snapshots
+
+A feed (or anyone with a browser) drops matchup_{i}.html snapshots of the current week into a drop
+directory, write then rename so a half written file is never read. LiveScoring polls the directory
+with asyncio and, for every snapshot that changed, re-parses only that matchup, diffs the players'
+fan_pts against what it had and swaps the MatchUp into a new Week. The untouched Rosters are reused,
+so a refresh is one parse plus the week's vectorized aggregates.
+A snapshot dropped ahead of the matchups before it is held back until the gap is filled.
+Subscribers get a LiveUpdate with just the changed players, the matchup's team rows and the week's rankings.
+
+python live.py 15                                        # watch matchup_data/live/ for week 15
+python live.py 14 --replay matchup_data/week14 -i 2      # stand-in feed, replays saved snapshots every 2s
+'''
+
+DROP_DIR = "matchup_data/live"
+POLL_INTERVAL = 0.25
+_RE_SNAPSHOT = re.compile(r"^matchup_(\d+)\.html$")
+
+
+class LiveUpdate:
+    '''The result of one snapshot, only what it changed'''
+    __slots__ = ("week", "matchup", "changes", "teams", "rankings", "elapsed")
+
+    def __init__(self, week: int, matchup: int, changes: pd.DataFrame, teams: pd.DataFrame, rankings: pd.DataFrame, elapsed: float):
+        self.week = week
+        self.matchup = matchup
+        self.changes = changes
+        self.teams = teams
+        self.rankings = rankings
+        self.elapsed = elapsed
+
+
+def player_changes(old: None | MatchUp, new: MatchUp) -> pd.DataFrame:
+    '''Returns |team|slot|player|old|new| for every roster slot whose player or fan_pts changed, every slot if old is None'''
+    rows = []
+    for side, new_roster in enumerate([new.team1_roster, new.team2_roster]):
+        old_players = [None] * len(ROSTER_SLOTS) if old is None else [old.team1_roster, old.team2_roster][side].players
+        for slot, old_player, new_player in zip(ROSTER_SLOTS, old_players, new_roster.players):
+            if old_player is None:
+                rows.append([new_roster.team_name, slot, new_player.name, None, new_player.fan_pts])
+            elif old_player.name != new_player.name or old_player.fan_pts != new_player.fan_pts:
+                rows.append([new_roster.team_name, slot, new_player.name, old_player.fan_pts, new_player.fan_pts])
+    return pd.DataFrame(rows, columns=["team", "slot", "player", "old", "new"])
+
+
+class LiveScoring:
+    '''Keeps a Week (and the Season it's in, if given) up to date from the snapshots in a drop directory
+
+    self.week is replaced, never modified, so a reader on another thread (e.g. the dashboard) always
+    sees a complete Week. self.version goes up with every update.
+    '''
+    def __init__(self, week: Week, season: None | Season = None, drop_dir=DROP_DIR):
+        self.week = week
+        self.season = season
+        self.drop_dir = drop_dir
+        self.version = 0
+        self.latest: None | LiveUpdate = None
+        self._seen: dict[str, tuple[int, int]] = {}
+        # matchup number -> latest snapshot of a matchup dropped before the ones ahead of it
+        self._pending: dict[int, MatchUp] = {}
+        self._subscribers: list[asyncio.Queue] = []
+
+    def subscribe(self) -> asyncio.Queue:
+        '''Returns a queue that gets every LiveUpdate from now on'''
+        queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        return queue
+
+    @timed("LiveScoring.apply")
+    def apply(self, i: int, matchup: MatchUp) -> None | LiveUpdate:
+        '''Swap in the new snapshot of matchup i, returns None when nothing changed
+
+        a matchup dropped before the ones ahead of it is kept pending (and None returned), see apply_pending
+        '''
+        start = time.perf_counter()
+        matchups = list(self.week.league_matchups)
+        if i > len(matchups) + 1:
+            self._pending[i] = matchup
+            return None
+        if i <= len(matchups):
+            changes = player_changes(matchups[i - 1], matchup)
+            if changes.empty and matchups[i - 1].teams == matchup.teams:
+                return None
+            matchups[i - 1] = matchup
+        else:
+            changes = player_changes(None, matchup)
+            matchups.append(matchup)
+        week = Week(matchups, self.week.week)
+        if self.season is not None:
+            self.season.append_week(week)
+        team_df = week.team_df
+        update = LiveUpdate(week.week, i, changes, team_df[team_df["matchup"] == i], week.advanced_df, 0.0)
+        self.week = week
+        update.elapsed = time.perf_counter() - start
+        self.latest = update
+        self.version += 1
+        for queue in self._subscribers:
+            queue.put_nowait(update)
+        return update
+
+    def apply_pending(self) -> list[LiveUpdate]:
+        '''Apply the pending matchups that are next in line, returns their updates'''
+        updates = []
+        while len(self.week.league_matchups) + 1 in self._pending:
+            i = len(self.week.league_matchups) + 1
+            updates.append(self.apply(i, self._pending.pop(i)))
+        return updates
+
+    def changed_snapshots(self) -> list[tuple[int, str]]:
+        '''Returns (i, path) of every snapshot that is new or changed since the last poll'''
+        changed = []
+        try:
+            entries = list(os.scandir(self.drop_dir))
+        except FileNotFoundError:
+            return changed
+        for entry in entries:
+            match = _RE_SNAPSHOT.match(entry.name)
+            if match is None:
+                continue
+            stat = entry.stat()
+            if self._seen.get(entry.path) != (stat.st_mtime_ns, stat.st_size):
+                self._seen[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                changed.append((int(match.group(1)), entry.path))
+        return sorted(changed)
+
+    async def poll(self) -> list[LiveUpdate]:
+        '''Apply every new snapshot in the drop directory once'''
+        updates = []
+        for i, path in self.changed_snapshots():
+            count("live snapshots")
+            try:
+                matchup = await asyncio.to_thread(parse_matchup_html, path)
+            except Exception as e:
+                # skipped until the file changes again
+                print(f"skipping {path}: {type(e).__name__}: {e}")
+                continue
+            update = self.apply(i, matchup)
+            if update is not None:
+                updates.append(update)
+                updates.extend(self.apply_pending())
+        return updates
+
+    async def watch(self, interval=POLL_INTERVAL):
+        '''Poll the drop directory forever'''
+        while True:
+            await self.poll()
+            await asyncio.sleep(interval)
+
+
+async def replay(source_dir: str, drop_dir=DROP_DIR, interval=1.0):
+    '''Stand-in feed, copies every matchup_{i}.html of source_dir into drop_dir one at a time'''
+    os.makedirs(drop_dir, exist_ok=True)
+    names = sorted((name for name in os.listdir(source_dir) if _RE_SNAPSHOT.match(name)), key=lambda name: int(_RE_SNAPSHOT.match(name).group(1)))
+    for name in names:
+        target = os.path.join(drop_dir, name)
+        shutil.copyfile(os.path.join(source_dir, name), f"{target}.tmp")
+        os.replace(f"{target}.tmp", target)
+        await asyncio.sleep(interval)
+
+
+def start_live(week: int, drop_dir=DROP_DIR) -> LiveScoring:
+    '''Returns a LiveScoring that starts from the saved matchup_data/week{N} if there is one, otherwise from the snapshots already dropped
+
+    the snapshots already in the drop directory are marked as seen, the ones held back stay pending
+    '''
+    if os.path.isdir(f"matchup_data/week{week}"):
+        live = LiveScoring(load_season([week])[0], drop_dir=drop_dir)
+        live.changed_snapshots()
+        return live
+    live = LiveScoring(Week([], week), drop_dir=drop_dir)
+    asyncio.run(live.poll())
+    if not live.week.league_matchups and not live._pending:
+        raise FileNotFoundError(f"no matchup_data/week{week} and no snapshots in {drop_dir}")
+    return live
+
+
+async def _print_updates(live: LiveScoring):
+    queue = live.subscribe()
+    while True:
+        update = await queue.get()
+        print(f"week {update.week} matchup {update.matchup}: {len(update.changes)} players changed in {update.elapsed * 1000:.1f} ms")
+        print(update.teams[["team", "opponent", "pf", "pa", "win"]].to_string(index=False))
+
+
+async def _run(args):
+    live = start_live(args.week, args.drop)
+    tasks = [live.watch(args.interval), _print_updates(live)]
+    if args.replay:
+        tasks.append(replay(args.replay, args.drop, args.replay_interval))
+    await asyncio.gather(*tasks)
+
+
+def main():
+    argParser = argparse.ArgumentParser()
+    argParser.add_argument("week", type=int, help="NFL Week being played")
+    argParser.add_argument("--drop", default=DROP_DIR, help="directory the matchup_{i}.html snapshots are dropped in")
+    argParser.add_argument("--interval", type=float, default=POLL_INTERVAL, help="seconds between polls")
+    argParser.add_argument("--replay", help="stand-in feed, replay the snapshots of this directory into the drop directory")
+    argParser.add_argument("-i", "--replay-interval", type=float, default=1.0, help="seconds between replayed snapshots")
+    args = argParser.parse_args()
+    try:
+        asyncio.run(_run(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+from lxml import etree
+import pandas as pd
+import re
+from fantasy_objects import Roster, MatchUp
+from profiling import timed
+
+'''
+Single pass parsers for the Yahoo matchup pages (matchup_{i}.html) and the weekly scoreboard (week{N}_matchups.html).
+
+The file is streamed through lxml once, the team names are pulled from the matchup header and
+the starting/bench roster tables are read, then parsing stops before the rest of the page
+(stat breakdowns, manager comparison, etc.) is ever tokenized. The scoreboard is read the same
+way, one <li> per matchup, and parsing stops at the end of the matchup list.
+'''
+
+SCOREBOARD_COLUMNS = {"Team1": "str", "Team1 Score": "float64", "Team2": "str", "Team2 Score": "float64", "Winner": "str"}
+
+ROSTER_TABLE_IDS = ("statTable1", "statTable2")
+# matches pandas.read_html's whitespace handling so the Player strings are identical
+_RE_WHITESPACE = re.compile(r"[\r\n]+|\s{2,}")
+
+# column positions in a Yahoo roster table row
+TEAM_1_COLS = [1, 2, 3]   # Player, Proj, Fan Pts
+TEAM_2_COLS = [9, 8, 7]   # Player.1, Proj.1, Fan Pts.1
+
+
+def _cell_text(cell) -> str:
+    '''Returns the whitespace normalized text of a table cell'''
+    return _RE_WHITESPACE.sub(" ", cell.xpath("string()").strip())
+
+
+def _to_numeric(values: list[str]) -> pd.Series:
+    '''Converts a column to floats when every value is numeric, same as pandas.read_html'''
+    series = pd.Series([None if v == "" else v for v in values])
+    try:
+        return pd.to_numeric(series)
+    except (ValueError, TypeError):
+        return series
+
+
+def _table_to_df(table, cols: list[int]) -> pd.DataFrame:
+    '''Returns a |Player|Proj|Fan Pts| dataframe for one side of a roster table'''
+    rows = [row.findall("td") for row in table.iterfind("tbody/tr")]
+    player = [_cell_text(row[cols[0]]) or None for row in rows]
+    proj = _to_numeric([_cell_text(row[cols[1]]) for row in rows])
+    fan_pts = _to_numeric([_cell_text(row[cols[2]]) for row in rows])
+    return pd.DataFrame({"Player": player, "Proj": proj, "Fan Pts": fan_pts})
+
+
+def _team_key(href) -> None | int:
+    '''Returns the Yahoo team number from a team link (.../f1/{league}/{team}), None if there isn't one'''
+    key = (href or "").rstrip("/").rsplit("/", 1)[-1]
+    return int(key) if key.isdigit() else None
+
+
+def _team_names(header) -> list[tuple[str, None | int]]:
+    '''Returns both team names, with their Yahoo team number, from the matchup-header section'''
+    return [(_cell_text(a), _team_key(a.get("href"))) for a in header.xpath('.//div[contains(@class, "Fz-xxl")]/a')]
+
+
+@timed("parse_matchup_html")
+def parse_matchup_html(path: str) -> MatchUp:
+    '''Parse a Yahoo matchup_{i}.html file into a MatchUp in a single streaming pass'''
+    teams = None
+    tables = {}
+    context = etree.iterparse(path, events=("end",), tag=("section", "table"), html=True, encoding="utf-8")
+    for _, element in context:
+        if element.tag == "section" and element.get("id") == "matchup-header":
+            teams = _team_names(element)
+        elif element.get("id") in ROSTER_TABLE_IDS:
+            tables[element.get("id")] = element
+            if len(tables) == len(ROSTER_TABLE_IDS):
+                break
+    if teams is None or len(teams) != 2:
+        raise ValueError(f"matchup header not found in {path}")
+    if len(tables) != len(ROSTER_TABLE_IDS):
+        raise ValueError(f"roster tables not found in {path}")
+    starting, bench = tables["statTable1"], tables["statTable2"]
+    (team_1, team_1_key), (team_2, team_2_key) = teams
+    team_1_roster = Roster(team_1, _table_to_df(starting, TEAM_1_COLS), _table_to_df(bench, TEAM_1_COLS), team_key=team_1_key)
+    team_2_roster = Roster(team_2, _table_to_df(starting, TEAM_2_COLS), _table_to_df(bench, TEAM_2_COLS), team_key=team_2_key)
+    return MatchUp(team_1_roster, team_2_roster)
+
+
+def _scoreboard_row(item) -> None | list:
+    '''Returns |Team1|Team1 Score|Team2|Team2 Score|Winner| from a scoreboard <li>, None if it isn't a matchup'''
+    teams = [_cell_text(a) for a in item.xpath('.//a[contains(@class, "F-link")]')]
+    scores = [_cell_text(div) for div in item.xpath('.//div[contains(@class, "Fz-lg")]')]
+    if len(teams) != 2 or len(scores) != 2:
+        return None
+    team1_score, team2_score = float(scores[0]), float(scores[1])
+    # a tie goes to team1, same as the original scoreboard csv
+    winner = teams[1] if team2_score > team1_score else teams[0]
+    return [teams[0], team1_score, teams[1], team2_score, winner]
+
+
+@timed("parse_scoreboard_html")
+def parse_scoreboard_html(path: str) -> pd.DataFrame:
+    '''Parse a Yahoo week{N}_matchups.html into one row per matchup, however many matchups the league has'''
+    rows = []
+    context = etree.iterparse(path, events=("end",), tag=("li", "ul"), html=True, encoding="utf-8")
+    for _, element in context:
+        if element.tag == "li":
+            row = _scoreboard_row(element)
+            if row is not None:
+                rows.append(row)
+        elif rows:
+            # the end of the list the matchups are in, the rest of the page is navigation
+            break
+    if not rows:
+        raise ValueError(f"no matchups found in {path}")
+    return pd.DataFrame(rows, columns=list(SCOREBOARD_COLUMNS)).astype(SCOREBOARD_COLUMNS)
@@ -0,0 +1,121 @@
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+from profiling import timed
+from utils import EMPTY_SLOT, normalize_player_name, player_key
+
+'''
+Player index for a season
+
+Player objects are built fresh in every Roster, so a player has no identity across weeks. The
+index keys every appearance (week, roster, slot) by utils.player_key, the normalized name plus
+NFL team, with secondary indexes by NFL team and by position. Every lookup only touches the rows
+it returns instead of scanning every roster of every week, and adding (or replacing) a week only
+indexes that week's rows, see Season.player_index.
+
+index = season.player_index
+index.appearances("C. Kupp", "LAR")              # every week, roster and slot C. Kupp was in
+index.points_by_manager("C. Kupp", "LAR")        # his starting points for every team that had him
+index.by_nfl_team("KC", week=10, started=True)   # the KC players started in week 10
+'''
+
+# fantasy_objects.BENCH_LINEUP, BN1 ... BN8, every other slot is a starting one
+BENCH_PREFIX = "BN"
+COLUMNS = ["key", "week", "matchup", "team", "team_key", "slot", "started", "player", "position", "nfl_team", "proj", "fan_pts"]
+
+
+class PlayerIndex:
+    '''Every roster slot of a season, indexed by player key, NFL team and position'''
+    def __init__(self, weeks=()):
+        self._weeks: dict[int, dict[str, np.ndarray]] = {}
+        # index -> value -> week -> row positions in self._weeks[week]
+        self._keys: dict[str, dict[int, np.ndarray]] = defaultdict(dict)
+        self._nfl_teams: dict[str, dict[int, np.ndarray]] = defaultdict(dict)
+        self._positions: dict[str, dict[int, np.ndarray]] = defaultdict(dict)
+        # player key -> the name shown for it, the latest one used
+        self._names: dict[str, str] = {}
+        for week in weeks:
+            self.add_week(week)
+
+    def __len__(self):
+        '''Returns the number of players'''
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    @property
+    def keys(self) -> list[str]:
+        return list(self._keys)
+
+    def name(self, key: str) -> str:
+        return self._names[key]
+
+    @timed("PlayerIndex.add_week")
+    def add_week(self, week):
+        '''Index a Week's roster slots (its player_df), a week that is already indexed is replaced'''
+        if week.week in self._weeks:
+            self._remove_week(week.week)
+        df = week.player_df
+        df = df[df["position"] != EMPTY_SLOT]
+        names = [normalize_player_name(name) for name in df["player"].astype(str)]
+        nfl_teams = df["nfl_team"].astype(object).where(df["nfl_team"].notna(), None).tolist()
+        positions = df["position"].astype(object).where(df["position"].notna(), None).tolist()
+        columns = {"key": np.array([player_key(name, team) for name, team in zip(names, nfl_teams)], dtype=object),
+                   "week": df["week"].to_numpy(), "matchup": df["matchup"].to_numpy(),
+                   "team": df["team"].astype(str).to_numpy(dtype=object), "team_key": df["team_key"].to_numpy(),
+                   "slot": df["slot"].astype(str).to_numpy(dtype=object), "started": ~df["slot"].astype(str).str.startswith(BENCH_PREFIX).to_numpy(),
+                   "player": np.array(names, dtype=object), "position": np.array(positions, dtype=object),
+                   "nfl_team": np.array(nfl_teams, dtype=object), "proj": df["proj"].to_numpy(), "fan_pts": df["fan_pts"].to_numpy()}
+        # kept as plain arrays, a lookup is then a take per column instead of a dataframe per week
+        self._weeks[week.week] = columns
+        for index, column in ((self._keys, "key"), (self._nfl_teams, "nfl_team"), (self._positions, "position")):
+            for value, rows in pd.Series(columns[column]).groupby(columns[column], sort=False).indices.items():
+                index[value][week.week] = rows
+        self._names.update(zip(columns["key"], columns["player"]))
+
+    def _remove_week(self, week: int):
+        columns = self._weeks.pop(week)
+        for index, column in ((self._keys, "key"), (self._nfl_teams, "nfl_team"), (self._positions, "position")):
+            for value in set(columns[column]) - {None}:
+                del index[value][week]
+                if not index[value]:
+                    del index[value]
+
+    def _take(self, index: dict[str, dict[int, np.ndarray]], value, week=None, started=None, columns=COLUMNS) -> dict[str, np.ndarray]:
+        '''Returns the given columns of the indexed rows of a value, in week order'''
+        weeks = index.get(value, {})
+        if week is not None:
+            weeks = {week: weeks[week]} if week in weeks else {}
+        rows = sorted(weeks.items())
+        if started is not None:
+            rows = [(w, positions[self._weeks[w]["started"][positions] == started]) for w, positions in rows]
+        return {column: np.concatenate([self._weeks[w][column][positions] for w, positions in rows]) if rows else np.array([])
+                for column in columns}
+
+    def _rows(self, index: dict[str, dict[int, np.ndarray]], value, week=None, started=None) -> pd.DataFrame:
+        return pd.DataFrame(self._take(index, value, week, started))
+
+    def _key(self, player: str, nfl_team: None | str) -> str:
+        return player if nfl_team is None and player in self._keys else player_key(player, nfl_team)
+
+    def appearances(self, player: str, nfl_team: None | str = None, week=None, started=None) -> pd.DataFrame:
+        '''Returns every week, roster and slot a player was in, by name and NFL team or by player key'''
+        return self._rows(self._keys, self._key(player, nfl_team), week, started)
+
+    def by_nfl_team(self, nfl_team: str, week=None, started=None) -> pd.DataFrame:
+        '''Returns every rostered player of an NFL team, started=True for only the starters'''
+        return self._rows(self._nfl_teams, nfl_team, week, started)
+
+    def by_position(self, position: str, week=None, started=None) -> pd.DataFrame:
+        '''Returns every rostered player of a position (QB, WR, ..., DEF)'''
+        return self._rows(self._positions, position, week, started)
+
+    def points_by_manager(self, player: str, nfl_team: None | str = None) -> pd.DataFrame:
+        '''Returns |team|weeks|started|points| of a player for every team that rostered them, points only count when started'''
+        rows = self._take(self._keys, self._key(player, nfl_team), columns=["team", "started", "fan_pts"])
+        teams, codes = np.unique(rows["team"].astype(str), return_inverse=True)
+        started = rows["started"].astype(bool)
+        return pd.DataFrame({"team": teams, "weeks": np.bincount(codes, minlength=len(teams)),
+                             "started": np.bincount(codes, weights=started, minlength=len(teams)).astype(int),
+                             "points": np.bincount(codes, weights=np.where(started, rows["fan_pts"].astype(float), 0.0), minlength=len(teams))})
@@ -0,0 +1,62 @@
+import numpy as np
+
+'''
+Monte Carlo playoff odds
+
+The rest of the schedule is played out n_seasons times at once. Every team's score in a remaining
+matchup is drawn from its own weekly scores so far (Season.points), then the standings of every
+simulated season are sorted by wins with PF as the tiebreaker. Teams are indexed by team id, the
+same as rankings.py, and the remaining matchups come from rankings.schedule_matchups.
+'''
+
+PLAYOFF_SPOTS = 4
+# simulated seasons per batch, keeps the sampled score arrays small for long schedules
+BATCH_SIZE = 25_000
+
+
+def standings_order(wins: np.ndarray, pf: np.ndarray) -> np.ndarray:
+    '''Returns the team ids from first to last place, most wins first and PF breaking ties
+
+    works on a single season (teams,) or a batch of seasons (seasons x teams)
+    '''
+    return np.lexsort((-np.asarray(pf), -np.asarray(wins)), axis=-1)
+
+
+def _incidence(team_ids: np.ndarray, n_teams: int) -> np.ndarray:
+    '''Returns a (games x teams) one hot matrix, so per game results sum into per team totals with a matmul'''
+    incidence = np.zeros((len(team_ids), n_teams))
+    incidence[np.arange(len(team_ids)), team_ids] = 1
+    return incidence
+
+
+def simulate_seeds(points: np.ndarray, wins: np.ndarray, pf: np.ndarray, matchups: np.ndarray,
+                   n_seasons=100_000, seed=None) -> np.ndarray:
+    '''Returns a (teams x seeds) matrix with the probability of every team finishing in every seed
+
+    points   team x week matrix of weekly scores, nan for a week a team didn't play
+    wins, pf the current wins and points for of every team
+    matchups (games x 2) team ids of every remaining matchup, a tie goes to team2 like MatchUp.winner
+    '''
+    rng = np.random.default_rng(seed)
+    points = np.asarray(points, dtype=float)
+    n_teams = len(points)
+    # move every team's real scores to the front of its row, a sampled index below its count is always a score
+    played = ~np.isnan(points)
+    counts = played.sum(axis=1)
+    scores = np.take_along_axis(points, np.argsort(~played, axis=1, kind="stable"), axis=1)
+    team1, team2 = matchups[:, 0], matchups[:, 1]
+    team1_incidence, team2_incidence = _incidence(team1, n_teams), _incidence(team2, n_teams)
+
+    seed_counts = np.zeros(n_teams * n_teams, dtype=np.int64)
+    for start in range(0, n_seasons, BATCH_SIZE):
+        size = min(BATCH_SIZE, n_seasons - start)
+        team1_pts = scores[team1, (rng.random((size, len(team1))) * counts[team1]).astype(int)]
+        team2_pts = scores[team2, (rng.random((size, len(team2))) * counts[team2]).astype(int)]
+        team1_wins = team1_pts > team2_pts
+        season_wins = wins + team1_wins @ team1_incidence + ~team1_wins @ team2_incidence
+        season_pf = pf + team1_pts @ team1_incidence + team2_pts @ team2_incidence
+        order = standings_order(season_wins, season_pf)
+        # order[s, k] is the team finishing k+1, count every (team, seed) pair
+        seeds = np.broadcast_to(np.arange(n_teams), order.shape)
+        seed_counts += np.bincount((order * n_teams + seeds).ravel(), minlength=n_teams * n_teams)
+    return seed_counts.reshape(n_teams, n_teams) / n_seasons
@@ -0,0 +1,110 @@
+from contextlib import contextmanager
+from functools import wraps
+import atexit
+import json
+import os
+import threading
+import time
+
+'''
+Opt-in timers and counters for the ingest -> aggregate -> render pipeline
+
+Off by default, every timed/count call is then a single flag check. Turn it on with
+
+SUNNYVALE_PROFILE=profile.json streamlit run dashboard.py   # dumped to profile.json on exit, =1 for the default path
+streamlit run dashboard.py -- --profile profile.json       # dumped after every dashboard run
+
+or enable() from code. Timers record calls, total and max milliseconds per stage (nested stages
+are counted in both), counters are plain totals (files parsed, cache hits/misses, rows built).
+Only the current process is measured, work done in a process pool shows up as its parent stage.
+'''
+
+PROFILE_ENV = "SUNNYVALE_PROFILE"
+DEFAULT_PROFILE_PATH = "profile.json"
+
+_enabled = False
+_lock = threading.Lock()
+_timers: dict[str, list[float]] = {}   # stage -> [calls, total seconds, max seconds]
+_counters: dict[str, int] = {}
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = on
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    '''Clear every timer and counter'''
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+
+def record(stage: str, seconds: float):
+    '''Add one timed call of a stage'''
+    with _lock:
+        timer = _timers.setdefault(stage, [0, 0.0, 0.0])
+        timer[0] += 1
+        timer[1] += seconds
+        timer[2] = max(timer[2], seconds)
+
+
+def count(counter: str, n=1):
+    '''Add n to a counter, a no-op unless profiling is enabled'''
+    if _enabled:
+        with _lock:
+            _counters[counter] = _counters.get(counter, 0) + n
+
+
+@contextmanager
+def timed_block(stage: str):
+    '''Time a block, a no-op unless profiling is enabled'''
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start)
+
+
+def timed(stage: str):
+    '''Decorator that times every call of a function (or property getter) as a stage'''
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def stats() -> dict:
+    '''Returns {"timers": {stage: {"calls", "total_ms", "max_ms"}}, "counters": {counter: n}}'''
+    with _lock:
+        timers = {stage: {"calls": calls, "total_ms": round(total * 1000, 3), "max_ms": round(longest * 1000, 3)}
+                  for stage, (calls, total, longest) in _timers.items()}
+        return {"timers": timers, "counters": dict(_counters)}
+
+
+def dump(path=DEFAULT_PROFILE_PATH):
+    '''Write stats() as JSON, e.g. to compare two runs offline'''
+    profile = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), **stats()}
+    with open(path, "w") as fp:
+        json.dump(profile, fp, indent=1, sort_keys=True)
+
+
+if os.environ.get(PROFILE_ENV):
+    enable()
+    # SUNNYVALE_PROFILE=1 just turns it on, anything else is the path to dump to
+    atexit.register(dump, DEFAULT_PROFILE_PATH if os.environ[PROFILE_ENV] in ("1", "true") else os.environ[PROFILE_ENV])
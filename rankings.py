@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+'''
+Vectorized power rankings and projected records
+
+Everything here works on a team x week points matrix (Season.points) whose rows are indexed by
+team id (see teams.TeamRegistry). PF, ceiling, floor, the power ranking score and the
+projected record are then a handful of array operations instead of a DataFrame lookup per team
+or per scheduled matchup.
+'''
+
+# weight of every attribute in the power ranking score
+PF_WEIGHT = 4
+H2H_WEIGHT = 3
+CEILING_WEIGHT = 2
+FLOOR_WEIGHT = 1
+# the PF, ceiling and floor only count the most recent weeks
+RECENT_WEEKS = 5
+
+
+def pf_ceiling_floor(points: np.ndarray, last_n=RECENT_WEEKS) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    '''Returns the PF, ceiling and floor of every team over the last n weeks of a team x week matrix
+
+    weeks a team has no score for (nan) are skipped, last_n=None uses every week
+    '''
+    recent = points if last_n is None else points[:, -last_n:]
+    return np.nansum(recent, axis=1), np.nanmax(recent, axis=1), np.nanmin(recent, axis=1)
+
+
+def _scaled(values: np.ndarray, weight: int) -> np.ndarray:
+    '''Scale an attribute so the league best gets weight points per team in the league'''
+    return values / values.max() * len(values) * weight
+
+
+def power_ranking_scores(points: np.ndarray, h2h_wins: np.ndarray, last_n=RECENT_WEEKS) -> np.ndarray:
+    '''Returns the power ranking score (PR Total) of every team
+
+    - PF = 1st (4pts per team)
+    - H2H Wins = 2nd (3pts per team)
+    - Ceiling = 3rd (2pts per team)
+    - Floor = 4th (1pt per team)
+    '''
+    pf, ceiling, floor = pf_ceiling_floor(points, last_n)
+    return (_scaled(pf, PF_WEIGHT) + _scaled(np.asarray(h2h_wins, dtype=float), H2H_WEIGHT)
+            + _scaled(ceiling, CEILING_WEIGHT) + _scaled(floor, FLOOR_WEIGHT))
+
+
+def power_rankings(scores: np.ndarray) -> np.ndarray:
+    '''Returns the power ranking of every team from their scores, 1 being the best and ties averaged'''
+    return pd.Series(scores).rank(ascending=False).to_numpy()
+
+
+def schedule_matchups(schedule: dict[str, list[list[str]]], ids, after_week=0) -> np.ndarray:
+    '''Returns a (matchups x 2) array of team ids for every scheduled matchup after a given week
+
+    schedule is keyed by "week{N}" (see utils.schedule) and may hold any number of weeks, ids maps a
+    team name to its id, e.g. a TeamRegistry
+    '''
+    matchups = [[ids[team1], ids[team2]] for week, games in schedule.items() if int(week[4:]) > after_week
+                for team1, team2 in games]
+    return np.array(matchups, dtype=int).reshape(-1, 2)
+
+
+def projected_record(wins: np.ndarray, losses: np.ndarray, rankings: np.ndarray, matchups: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    '''Plays out the scheduled matchups, the better (lower) power ranking wins and team1 wins a tie'''
+    team1, team2 = matchups[:, 0], matchups[:, 1]
+    team1_wins = rankings[team1] <= rankings[team2]
+    winners = np.where(team1_wins, team1, team2)
+    losers = np.where(team1_wins, team2, team1)
+    return (np.asarray(wins) + np.bincount(winners, minlength=len(wins)),
+            np.asarray(losses) + np.bincount(losers, minlength=len(losses)))
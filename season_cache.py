@@ -0,0 +1,175 @@
+import json
+import os
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from convert_html_to_csv import convert_detailed_matchup_to_df, matchup_numbers
+from fantasy_objects import Week, categorize_player_df
+from profiling import count, timed
+
+'''
+Persistent on-disk cache of parsed weeks so a restart doesn't re-parse every matchup html
+
+Every cached week lives in a single consolidated matchup_data/.cache/season.arrow, one row per
+roster slot per week sorted by week. It's an uncompressed Arrow IPC file that is memory-mapped
+rather than read: every process (e.g. each Streamlit worker) maps the same file, the pages are
+shared through the OS page cache and a week is a zero-copy slice of the mapped table. The Weeks
+built from it read their player_df straight from those buffers, their MatchUp/Roster/Player
+objects are only built if a page needs them.
+
+The file's metadata holds a fingerprint (path, mtime, size) of every matchup_{i}.html each week
+was built from, a week is only re-parsed when one of those files is added, removed or changed.
+'''
+
+CACHE_DIR = "matchup_data/.cache"
+CACHE_PATH = f"{CACHE_DIR}/season.arrow"
+CACHE_VERSION = 8
+FINGERPRINT_KEY = b"sunnyvale_fingerprints"
+
+COLUMNS = ["week", "matchup", "team", "team_key", "slot", "player", "position", "nfl_team", "proj", "fan_pts"]
+STRING_COLUMNS = ["team", "slot", "player", "position", "nfl_team"]
+SCHEMA = pa.schema([("week", pa.int16()), ("matchup", pa.int16()), ("team", pa.string()), ("team_key", pa.int16()),
+                    ("slot", pa.string()), ("player", pa.string()), ("position", pa.string()), ("nfl_team", pa.string()),
+                    ("proj", pa.float64()), ("fan_pts", pa.float64())])
+
+# mkstemp creates the cache owner-only, it gets the mode a plain open() would have given it so
+# a worker running as another user can still map it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+CACHE_MODE = 0o666 & ~_UMASK
+
+# the table mapped by this process, reused until the file is replaced
+_mapped: dict[str, tuple[tuple[int, int], pa.Table]] = {}
+_mapped_lock = threading.Lock()
+
+
+def matchup_paths(week) -> list[str]:
+    '''Returns the matchup html paths for a given week'''
+    return [f"matchup_data/week{week}/matchup_{i}.html" for i in matchup_numbers(week)]
+
+
+def week_fingerprint(week) -> dict:
+    '''Returns the path, mtime and size of every source html for a week'''
+    files = {}
+    for path in matchup_paths(week):
+        try:
+            stat = os.stat(path)
+            files[path] = [stat.st_mtime_ns, stat.st_size]
+        except FileNotFoundError:
+            files[path] = None
+    return {"version": CACHE_VERSION, "files": files}
+
+
+def week_to_df(week: Week) -> pd.DataFrame:
+    '''Returns the Week's columnar store (one row per roster slot) in the cached layout'''
+    return week.player_df[COLUMNS]
+
+
+def week_from_df(df: pd.DataFrame, week) -> Week:
+    '''Returns a Week backed by the long dataframe created by week_to_df, its MatchUps are built on first use'''
+    return Week(None, week, player_df=categorize_player_df(df.reset_index(drop=True)))
+
+
+def mapped_table() -> None | pa.Table:
+    '''Returns the memory-mapped cache, None if there is no usable cache'''
+    try:
+        stat = os.stat(CACHE_PATH)
+    except FileNotFoundError:
+        return None
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _mapped_lock:
+        if CACHE_PATH in _mapped and _mapped[CACHE_PATH][0] == version:
+            return _mapped[CACHE_PATH][1]
+        try:
+            table = pa.ipc.open_file(pa.memory_map(CACHE_PATH, "r")).read_all()
+        except (OSError, pa.ArrowException):
+            return None
+        if not table.schema.equals(SCHEMA, check_metadata=False):
+            return None
+        _mapped[CACHE_PATH] = (version, table)
+        count("cache files mapped")
+        return table
+
+
+def _cached_fingerprints(table: None | pa.Table) -> dict[str, dict]:
+    '''Returns the fingerprint of every week in the cache keyed by str(week), empty if there is no usable cache'''
+    if table is None:
+        return {}
+    try:
+        return json.loads((table.schema.metadata or {}).get(FINGERPRINT_KEY, b"{}"))
+    except ValueError:
+        return {}
+
+
+def _week_slices(table: pa.Table) -> dict[int, pa.Table]:
+    '''Returns the zero-copy slice of every week in the (week sorted) cache table'''
+    weeks = table.column("week").to_numpy()
+    numbers, starts, lengths = np.unique(weeks, return_index=True, return_counts=True)
+    return {int(week): table.slice(start, length) for week, start, length in zip(numbers, starts, lengths)}
+
+
+@timed("read_cached_weeks")
+def read_cached_weeks(fingerprints: dict[int, dict]) -> dict[int, Week]:
+    '''Returns every week that is cached and was built from the same source files, {week: fingerprint} in'''
+    table = mapped_table()
+    cached = _cached_fingerprints(table)
+    fresh = [week for week, fingerprint in fingerprints.items() if cached.get(str(week)) == fingerprint]
+    if not fresh:
+        return {}
+    slices = _week_slices(table)
+    # split_blocks keeps every numeric column a view of the mapped buffers instead of consolidating copies
+    return {week: week_from_df(slices[week].to_pandas(split_blocks=True), week) for week in fresh if week in slices}
+
+
+@timed("write_cached_weeks")
+def write_cached_weeks(weeks: list[Week], fingerprints: dict[int, dict]):
+    '''Add (or replace) Weeks in the cache along with the fingerprint of their source files'''
+    if not weeks:
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    table = mapped_table()
+    replaced = {week.week for week in weeks}
+    cached = {key: fingerprint for key, fingerprint in _cached_fingerprints(table).items() if int(key) not in replaced}
+    tables = [week_table for week, week_table in _week_slices(table).items() if str(week) in cached] if table is not None else []
+    for week in weeks:
+        df = week_to_df(week).astype({col: object for col in STRING_COLUMNS})
+        tables.append(pa.Table.from_pandas(df, schema=SCHEMA, preserve_index=False))
+    cached.update({str(week.week): fingerprints[week.week] for week in weeks})
+    table = pa.concat_tables(tables).sort_by([("week", "ascending"), ("matchup", "ascending")])
+    metadata = {FINGERPRINT_KEY: json.dumps(cached).encode()}
+    # write then rename so a concurrent reader never sees a half written file, processes that
+    # still have the old file mapped keep reading it until they notice the new one. Every writer
+    # gets its own temp file, two workers writing at once then each replace the cache with a whole file
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".arrow.tmp")
+    os.close(fd)
+    try:
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, SCHEMA.with_metadata(metadata)) as writer:
+            writer.write_table(table.combine_chunks())
+        os.chmod(tmp_path, CACHE_MODE)
+        os.replace(tmp_path, CACHE_PATH)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def load_week(week) -> Week:
+    '''Returns a Week from the cache, parsing the matchup html only when it is new or has changed'''
+    return load_weeks([week])[0]
+
+
+def load_weeks(weeks) -> list[Week]:
+    '''Returns a Week for every week number in weeks'''
+    fingerprints = {week: week_fingerprint(week) for week in weeks}
+    loaded = read_cached_weeks(fingerprints)
+    parsed = []
+    for week in fingerprints:
+        if week not in loaded:
+            matchups = [convert_detailed_matchup_to_df(week, i) for i in matchup_numbers(week)]
+            loaded[week] = Week(matchups, week)
+            # never cache a partially parsed week, it would hide the failure on the next load
+            if None not in matchups:
+                parsed.append(loaded[week])
+    write_cached_weeks(parsed, fingerprints)
+    return [loaded[week] for week in weeks]
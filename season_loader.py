@@ -0,0 +1,127 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import os
+import threading
+from fantasy_objects import MatchUp, Week
+from matchup_parser import parse_matchup_html
+from profiling import count, timed
+from season_cache import matchup_paths, read_cached_weeks, week_fingerprint, write_cached_weeks
+
+'''
+Parallel season ingestion
+
+Weeks that are already in the on-disk cache are read directly, every matchup of the remaining
+weeks is parsed in a process pool and the results are put back together into Weeks in order.
+LazyWeeks defers all of that until a week is first used, e.g. by a single week dashboard page.
+'''
+
+# weeks kept in memory by LazyWeeks, a full NFL regular season
+WEEK_CACHE_SIZE = 18
+
+
+class MatchupParseError(Exception):
+    '''A single matchup_{i}.html that could not be parsed'''
+    def __init__(self, week: int, matchup: int, reason: str):
+        super().__init__(f"week {week} matchup {matchup}: {reason}")
+        self.week = week
+        self.matchup = matchup
+        self.reason = reason
+
+
+class SeasonLoadError(Exception):
+    '''Raised by load_season with every matchup that failed to parse'''
+    def __init__(self, errors: list[MatchupParseError]):
+        super().__init__("failed to load " + "; ".join(str(error) for error in errors))
+        self.errors = errors
+
+
+@timed("load_season")
+def load_season(weeks, workers: None | int = None) -> list[Week]:
+    '''Returns a Week for every week number in weeks, parsing uncached matchups over workers processes
+
+    workers defaults to the number of cpus, workers=1 parses in the current process
+    '''
+    weeks = list(weeks)
+    fingerprints = {week: week_fingerprint(week) for week in weeks}
+    loaded: dict[int, Week] = read_cached_weeks(fingerprints)
+    count("season cache hits", len(loaded))
+    count("season cache misses", len(weeks) - len(loaded))
+
+    tasks = [(week, i, path) for week in weeks if week not in loaded
+             for i, path in enumerate(matchup_paths(week), start=1)]
+    results: dict[tuple[int, int], MatchUp] = {}
+    errors: list[MatchupParseError] = []
+    count("files parsed", len(tasks))
+    if tasks:
+        workers = min(workers or os.cpu_count() or 1, len(tasks))
+        if workers == 1:
+            outcomes = []
+            for _, _, path in tasks:
+                try:
+                    outcomes.append(parse_matchup_html(path))
+                except Exception as e:
+                    outcomes.append(e)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(parse_matchup_html, path) for _, _, path in tasks]
+                outcomes = [future.exception() or future.result() for future in futures]
+        for (week, i, _), outcome in zip(tasks, outcomes):
+            if isinstance(outcome, Exception):
+                errors.append(MatchupParseError(week, i, f"{type(outcome).__name__}: {outcome}"))
+            else:
+                results[(week, i)] = outcome
+
+    failed_weeks = {error.week for error in errors}
+    parsed = []
+    for week in weeks:
+        if week not in loaded and week not in failed_weeks:
+            matchups = [results[(week, i)] for i in range(1, len(matchup_paths(week)) + 1)]
+            loaded[week] = Week(matchups, week)
+            parsed.append(loaded[week])
+    write_cached_weeks(parsed, fingerprints)
+    if errors:
+        raise SeasonLoadError(errors)
+    return [loaded[week] for week in weeks]
+
+
+class LazyWeeks:
+    '''The Weeks of a season, each loaded on first access and kept in a bounded LRU
+
+    Indexes like the list load_season returns (weeks[0] is the first week), iterating loads every
+    week that isn't cached yet in one load_season call. A cached week is reloaded when its html changes.
+    '''
+    def __init__(self, weeks, maxsize=WEEK_CACHE_SIZE, workers: None | int = None):
+        self.weeks = list(weeks)
+        self.maxsize = maxsize
+        self.workers = workers
+        self._cache: OrderedDict[int, tuple[dict, Week]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.weeks)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.load(self.weeks[index])
+        return self.load([self.weeks[index]])[0]
+
+    def __iter__(self):
+        return iter(self.load(self.weeks))
+
+    def load(self, weeks) -> list[Week]:
+        '''Returns a Week for every week number in weeks, loading only the ones that aren't cached or have changed'''
+        with self._lock:
+            fingerprints = {week: week_fingerprint(week) for week in weeks}
+            missing = [week for week in weeks if week not in self._cache or self._cache[week][0] != fingerprints[week]]
+            count("week cache hits", len(weeks) - len(missing))
+            count("week cache misses", len(missing))
+            if missing:
+                for week in load_season(missing, workers=self.workers):
+                    self._cache[week.week] = (fingerprints[week.week], week)
+            loaded = []
+            for week in weeks:
+                self._cache.move_to_end(week)
+                loaded.append(self._cache[week][1])
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+            return loaded
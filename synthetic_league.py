@@ -0,0 +1,175 @@
+import argparse
+import html
+import os
+import numpy as np
+import pandas as pd
+from fantasy_objects import BENCH_LINEUP, STARTING_LINEUP, MatchUp, Roster
+from utils import team_abbrev
+
+'''
+Synthetic Yahoo-shaped leagues for benchmarking
+
+python synthetic_league.py /tmp/league                               # one 12 team, 14 week season
+python synthetic_league.py /tmp/league --teams 14 --weeks 14 --seasons 10 --seed 7
+
+Every season is written as its own {root}/{year}/matchup_data/week{N} directory holding the same
+files as the real archive: matchup_{i}.html (only the parts matchup_parser reads, laid out like
+Yahoo's page), week{N}_matchups.html, and the matchup_{i}.csv / matchup.csv the converter makes.
+The same seed always gives the same league.
+'''
+
+FIRST_YEAR = 2015
+LEAGUE_ID = 99882
+# players drafted per position, the starting slots plus enough of a bench to fill BN1..BN8
+DRAFT = {"QB": 2, "RB": 5, "WR": 6, "TE": 2, "DEF": 2}
+# mean and spread of the weekly points of a position
+SCORING = {"QB": (18, 7), "RB": (11, 7), "WR": (11, 7), "TE": (8, 5), "DEF": (7, 5)}
+# the slot order of a starting lineup and the positions that can fill it
+LINEUP = {"QB": "QB", "WR1": "WR", "WR2": "WR", "RB1": "RB", "RB2": "RB", "TE": "TE", "FLEX1": "RB", "FLEX2": "WR", "DEF": "DEF"}
+
+_PLAYER_CELL = ('<td class="Ta-start player"><div class="ysf-player-name"><a class="F-link">{name}</a>'
+                '<span class="D-b"><span class="Fz-xxs">{team} - {position}</span> </span></div> '
+                '<div class="ysf-player-detail Fz-xxs">{game}</div></td>')
+_MATCHUP_PAGE = '''<html><head><meta charset="utf-8"></head><body>
+<section id="matchup-header"><div class="Grid-h-mid">
+<div class="Fz-xxl Ell"><a class="F-link" href="https://football.fantasysports.yahoo.com/f1/{league}/{key1}">{team1}</a></div>
+<div class="Fz-xxl Ell"><a class="F-link" href="https://football.fantasysports.yahoo.com/f1/{league}/{key2}">{team2}</a></div>
+</div></section>
+<table id="statTable1"><tbody>{starting}</tbody></table>
+<table id="statTable2"><tbody>{bench}</tbody></table>
+</body></html>
+'''
+# same li/div/a nesting as Yahoo's scoreboard, see matchup_parser.parse_scoreboard_html
+_SCOREBOARD_ITEM = '''<li class="Linkable Listitem No-p">
+<div class="Ta-c Js-hidden"><a href="/f1/{league}/matchup?week={week}&amp;mid1={key1}&amp;mid2={key2}">View Matchup</a></div>
+<div class="Grid-table"><div class="Grid-u-6-13 Py-med"><div class="Grid-h-mid Nowrap Ta-start"><div class="Grid-u-3-4">
+<div class="Ta-end Grid-h-mid"><div class="Grid-u Pend-lg">
+<div class="Fz-sm Ell"><a class="F-link" href="https://football.fantasysports.yahoo.com/f1/{league}/{key1}">{team1}</a></div>
+<div class="Fz-xxs F-shade">{record1}</div>
+</div><span class="Grid-u"><a class="Grid-u" href="/f1/{league}/{key1}"><img alt="logo"/> </a></span></div></div>
+<div class="Grid-u-1-4"><div class="Ta-end Pend-lg"><div class="Fz-lg">{score1:.2f}</div> <div class="F-shade">{proj1:.2f}</div></div></div>
+</div></div>
+<div class="Grid-u-1-13 Ta-c Va-mid"><span class="F-shade">vs</span></div>
+<div class="Grid-u-6-13 Py-med"><div class="Grid-h-mid Nowrap Ta-end">
+<div class="Grid-u-1-4"><div class="Pstart-lg Ta-start"><div class="Fz-lg">{score2:.2f}</div> <div class="F-shade">{proj2:.2f}</div></div></div>
+<div class="Grid-u-3-4"><div class="Grid-h-mid Ta-start"><span class="Grid-u"><a class="Grid-u" href="/f1/{league}/{key2}"><img alt="logo"/> </a></span>
+<div class="Grid-u Pstart-lg"><div class="Fz-sm Ell"><a class="F-link" href="https://football.fantasysports.yahoo.com/f1/{league}/{key2}">{team2}</a></div>
+<div class="Fz-xxs F-shade">{record2}</div></div></div></div>
+</div></div></div>
+</li>
+'''
+
+
+def round_robin(n_teams: int, n_weeks: int) -> list[list[tuple[int, int]]]:
+    '''Returns the (team, team) pairs of every week, the circle method repeated for as many weeks as needed'''
+    teams = list(range(n_teams))
+    weeks = []
+    for _ in range(n_weeks):
+        weeks.append([(teams[i], teams[-1 - i]) for i in range(n_teams // 2)])
+        teams = [teams[0], teams[-1]] + teams[1:-1]
+    return weeks
+
+
+def draft_rosters(n_teams: int, rng: np.random.Generator) -> list[list[tuple[str, str, str, float]]]:
+    '''Returns every team's players as (name, nfl team, position, projection), starters first in LINEUP order'''
+    rosters = []
+    for t in range(n_teams):
+        pool = {}
+        for position, n in DRAFT.items():
+            mean, _ = SCORING[position]
+            pool[position] = [(f"{chr(65 + (t + j) % 26)}. {position.title()}{t:02d}{j}", str(rng.choice(team_abbrev)).title(),
+                               position, round(float(rng.normal(mean, 2)), 2)) for j in range(n)]
+        starters = [pool[position].pop(0) for position in LINEUP.values()]
+        bench = [player for position in DRAFT for player in pool[position]][:len(BENCH_LINEUP)]
+        rosters.append(starters + bench)
+    return rosters
+
+
+def _player_cell(player, game: str) -> str:
+    name, nfl_team, position, _ = player
+    return _PLAYER_CELL.format(name=html.escape(name), team=nfl_team, position=position, game=game)
+
+
+def _table_rows(players1, players2, points1, points2, slots: list[str]) -> str:
+    '''Returns the <tr>'s of a roster table, both teams side by side like Yahoo's layout'''
+    rows = []
+    for slot, p1, p2, pts1, pts2 in zip(slots, players1, players2, points1, points2):
+        cells = ["<td></td>", _player_cell(p1, "Final W 27-20 vs Was"), f"<td><div>{p1[3]:.2f}</div></td>", f"<td><div>{pts1:.2f}</div></td>",
+                 "<td></td>", f"<td><div>{slot}</div></td>", "<td></td>",
+                 f"<td><div>{pts2:.2f}</div></td>", f"<td><div>{p2[3]:.2f}</div></td>", _player_cell(p2, "Final L 20-27 @ Dal"), "<td></td>"]
+        rows.append("<tr>" + "".join(cells) + "</tr>")
+    total = ["<td></td>", "<td></td>", "<td></td>", f"<td>{sum(points1[:len(slots)]):.2f}</td>", "<td>Total</td>", "<td>TOTAL</td>",
+             "<td>Total</td>", f"<td>{sum(points2[:len(slots)]):.2f}</td>", "<td></td>", "<td></td>", "<td></td>"]
+    rows.append("<tr>" + "".join(total) + "</tr>")
+    return "\n".join(rows)
+
+
+def _roster_df(players, points) -> pd.DataFrame:
+    return pd.DataFrame({"Player": [f"{p[0]}{p[1]} - {p[2]}" for p in players], "Proj": [p[3] for p in players], "Fan Pts": points})
+
+
+def generate_season(root: str, year: int, n_teams=12, n_weeks=14, seed=None) -> dict[str, list[list[str]]]:
+    '''Write one synthetic season to {root}/{year}/matchup_data
+
+    Returns the season's remaining schedule (the week after the last one written) keyed like utils.schedule
+    '''
+    rng = np.random.default_rng(seed)
+    teams = [f"Team {chr(65 + t % 26)}{t // 26 or ''} {year}" for t in range(n_teams)]
+    rosters = draft_rosters(n_teams, rng)
+    schedule = round_robin(n_teams, n_weeks + 1)
+    records = [[0, 0] for _ in teams]
+    for week in range(1, n_weeks + 1):
+        directory = os.path.join(root, str(year), "matchup_data", f"week{week}")
+        os.makedirs(directory, exist_ok=True)
+        scoreboard, league_rows = [], []
+        for i, (t1, t2) in enumerate(schedule[week - 1], start=1):
+            points = {}
+            for t in (t1, t2):
+                points[t] = [round(max(float(rng.normal(*SCORING[p[2]])), -4.0), 2) for p in rosters[t]]
+            page = _MATCHUP_PAGE.format(league=LEAGUE_ID, key1=t1 + 1, key2=t2 + 1, team1=html.escape(teams[t1]), team2=html.escape(teams[t2]),
+                                        starting=_table_rows(rosters[t1], rosters[t2], points[t1], points[t2], STARTING_LINEUP),
+                                        bench=_table_rows(rosters[t1][len(STARTING_LINEUP):], rosters[t2][len(STARTING_LINEUP):],
+                                                          points[t1][len(STARTING_LINEUP):], points[t2][len(STARTING_LINEUP):], BENCH_LINEUP))
+            with open(os.path.join(directory, f"matchup_{i}.html"), "w", encoding="utf-8") as fp:
+                fp.write(page)
+            starting = {t: _roster_df(rosters[t][:len(STARTING_LINEUP)], points[t][:len(STARTING_LINEUP)]) for t in (t1, t2)}
+            bench = {t: _roster_df(rosters[t][len(STARTING_LINEUP):], points[t][len(STARTING_LINEUP):]) for t in (t1, t2)}
+            matchup = MatchUp(Roster(teams[t1], starting[t1], bench[t1], team_key=t1 + 1), Roster(teams[t2], starting[t2], bench[t2], team_key=t2 + 1))
+            matchup.dataframe_for_csv.to_csv(os.path.join(directory, f"matchup_{i}.csv"))
+
+            score1, score2 = matchup.team1_roster.starting_points, matchup.team2_roster.starting_points
+            proj1, proj2 = (sum(p[3] for p in rosters[t][:len(STARTING_LINEUP)]) for t in (t1, t2))
+            scoreboard.append(_SCOREBOARD_ITEM.format(league=LEAGUE_ID, week=week, key1=t1 + 1, key2=t2 + 1,
+                                                      team1=html.escape(teams[t1]), team2=html.escape(teams[t2]),
+                                                      record1=f"{records[t1][0]}-{records[t1][1]}-0", record2=f"{records[t2][0]}-{records[t2][1]}-0",
+                                                      score1=score1, score2=score2, proj1=proj1, proj2=proj2))
+            league_rows.append([teams[t1], round(score1, 2), teams[t2], round(score2, 2), matchup.winner])
+            winner, loser = (t1, t2) if matchup.winner == teams[t1] else (t2, t1)
+            records[winner][0] += 1
+            records[loser][1] += 1
+        with open(os.path.join(directory, f"week{week}_matchups.html"), "w", encoding="utf-8") as fp:
+            fp.write('<html><head><meta charset="utf-8"></head><body><ul>\n' + "".join(scoreboard) + "</ul></body></html>\n")
+        pd.DataFrame(league_rows, columns=["Team1", "Team1 Score", "Team2", "Team2 Score", "Winner"]).to_csv(os.path.join(directory, "matchup.csv"))
+    return {f"week{n_weeks + 1}": [[teams[t1], teams[t2]] for t1, t2 in schedule[n_weeks]]}
+
+
+def generate_league(root: str, n_teams=12, n_weeks=14, n_seasons=1, seed=None) -> dict[int, dict[str, list[list[str]]]]:
+    '''Write n_seasons synthetic seasons under root, returns {year: remaining schedule}'''
+    seeds = np.random.SeedSequence(seed).spawn(n_seasons)
+    return {FIRST_YEAR + s: generate_season(root, FIRST_YEAR + s, n_teams, n_weeks, seeds[s]) for s in range(n_seasons)}
+
+
+def main():
+    argParser = argparse.ArgumentParser()
+    argParser.add_argument("root", help="directory to write the league to")
+    argParser.add_argument("--teams", type=int, default=12, help="teams in the league (even)")
+    argParser.add_argument("--weeks", type=int, default=14, help="weeks per season")
+    argParser.add_argument("--seasons", type=int, default=1, help="number of seasons")
+    argParser.add_argument("--seed", type=int, help="random seed, the same seed writes the same league")
+    args = argParser.parse_args()
+    if args.teams % 2:
+        argParser.error("--teams has to be even")
+    generate_league(args.root, args.teams, args.weeks, args.seasons, args.seed)
+
+if __name__ == "__main__":
+    main()
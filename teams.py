@@ -0,0 +1,102 @@
+from collections import Counter
+import numpy as np
+import pandas as pd
+
+'''
+Team identity registry
+
+Every team gets a stable integer id (0, 1, ... in the order they are first seen) that the Season
+aggregates index their arrays by. Team names change over a season, so every name a team has used
+is kept in an alias table pointing at its id. A name is linked to a team by the Yahoo team number
+in the matchup page (Roster.team_key), or by hand through utils.team_aliases. A team with a team
+number is always looked up by it, so renamed teams (or two that swap names) keep their ids.
+'''
+
+
+def _team_key(team_key) -> None | int:
+    '''Returns a Yahoo team number as an int, None when it's missing (None, NaN or NA)'''
+    return None if pd.isna(team_key) else int(team_key)
+
+
+class TeamRegistry:
+    '''Stable integer ids for the teams in a league, with every name a team has gone by as an alias'''
+    def __init__(self, aliases: None | dict[str, str] = None):
+        '''aliases maps an old team name to the name the team is known by, e.g. utils.team_aliases'''
+        self._ids: dict[str, int] = {}
+        self._keys: dict[int, int] = {}
+        self._name_counts: list[Counter] = []
+        self._manual_aliases = dict(aliases or {})
+
+    @classmethod
+    def from_weeks(cls, weeks, aliases: None | dict[str, str] = None):
+        '''Build a registry from the teams of every Week, in week order'''
+        registry = cls(aliases)
+        for week in weeks:
+            registry.add_week(week)
+        return registry
+
+    def add_week(self, week):
+        '''Register every team of a Week, from its team_df so its Rosters aren't built'''
+        team_df = week.team_df
+        for name, team_key in zip(team_df["team"], team_df["team_key"]):
+            self.add(name, team_key)
+
+    def add(self, name: str, team_key: None | int = None) -> int:
+        '''Returns the id of a team, registering it (or the new name of a known team) if needed'''
+        name = self._manual_aliases.get(name, name)
+        team_key = _team_key(team_key)
+        team_id = self._keys.get(team_key) if team_key is not None else None
+        if team_id is None:
+            team_id = self._ids.get(name)
+        if team_id is None:
+            team_id = len(self._name_counts)
+            self._name_counts.append(Counter())
+        if team_key is not None:
+            self._keys[team_key] = team_id
+        self._ids[name] = team_id
+        self._name_counts[team_id][name] += 1
+        return team_id
+
+    def __getitem__(self, name: str) -> int:
+        '''Returns the id of any name a team has used'''
+        return self._ids[self._manual_aliases.get(name, name)]
+
+    def __contains__(self, name: str) -> bool:
+        return self._manual_aliases.get(name, name) in self._ids
+
+    def __len__(self):
+        return len(self._name_counts)
+
+    def get(self, name: str, default=None):
+        '''Returns the id of a name, default if it was never used'''
+        return self._ids.get(self._manual_aliases.get(name, name), default)
+
+    def id(self, name: str, team_key: None | int = None) -> int:
+        '''Returns the id of a team by its Yahoo team number, by name when it has none'''
+        team_key = _team_key(team_key)
+        if team_key is not None and team_key in self._keys:
+            return self._keys[team_key]
+        return self[name]
+
+    def ids(self, names, team_keys=None) -> np.ndarray:
+        '''Returns the ids of a sequence of team names, by their Yahoo team numbers when given'''
+        if team_keys is None:
+            return np.array([self[name] for name in names], dtype=int)
+        return np.array([self.id(name, team_key) for name, team_key in zip(names, team_keys)], dtype=int)
+
+    def name(self, team_id: int) -> str:
+        '''Returns the name a team has used most, the most recent one on a tie'''
+        counts = self._name_counts[team_id]
+        return max(reversed(list(counts)), key=counts.get)
+
+    @property
+    def names(self) -> list[str]:
+        '''Returns the name of every team, indexed by id'''
+        return [self.name(team_id) for team_id in range(len(self))]
+
+    @property
+    def aliases(self) -> dict[str, int]:
+        '''Returns the alias table, every name ever used (and every manual alias) with its team id'''
+        table = dict(self._ids)
+        table.update({alias: self._ids[name] for alias, name in self._manual_aliases.items() if name in self._ids})
+        return table
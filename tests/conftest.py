@@ -0,0 +1,22 @@
+import os
+import sys
+import pytest
+
+'''The modules are top-level and read matchup_data/ from the working directory, so every test runs from the repo root'''
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    monkeypatch.chdir(ROOT)
+
+
+@pytest.fixture(scope="session")
+def weeks():
+    '''Every week of the checked in season'''
+    from convert_html_to_csv import available_weeks
+    from season_loader import load_season
+    os.chdir(ROOT)
+    return load_season(available_weeks())
@@ -0,0 +1,28 @@
+import os
+import pytest
+from convert_html_to_csv import convert_weeks, matchup_numbers
+from season_loader import SeasonLoadError, load_season
+from synthetic_league import generate_season
+
+
+@pytest.fixture
+def eight_teams(tmp_path, monkeypatch):
+    '''A 2 week synthetic season of an 8 team league, as the working directory'''
+    generate_season(str(tmp_path), 2015, n_teams=8, n_weeks=2, seed=0)
+    monkeypatch.chdir(tmp_path / "2015")
+
+
+def test_a_league_under_12_teams_loads(eight_teams):
+    assert matchup_numbers(1) == [1, 2, 3, 4]
+    weeks = load_season([1, 2], workers=1)
+    assert [len(week.league_matchups) for week in weeks] == [4, 4]
+    assert convert_weeks([1, 2], jobs=1) == {}
+
+
+def test_only_a_gap_is_missing(eight_teams):
+    os.remove("matchup_data/week1/matchup_2.html")
+    os.remove("matchup_data/week1/matchup_4.html")
+    assert matchup_numbers(1) == [1, 2, 3]
+    assert list(convert_weeks([1], jobs=1)) == ["matchup_data/week1/matchup_2.html"]
+    with pytest.raises(SeasonLoadError):
+        load_season([1], workers=1)
@@ -0,0 +1,36 @@
+import numpy as np
+from h2h import LOSS, TIE, WIN, all_play_pct, all_play_records, expected_wins, h2h_matrix, strength_of_schedule
+
+
+def test_a_tie_is_a_tie_both_ways():
+    matrix = h2h_matrix(np.array([100.0, 100.0, 90.0]))
+    assert matrix[0, 1, 0] == TIE and matrix[1, 0, 0] == TIE
+    assert matrix[0, 2, 0] == WIN and matrix[2, 0, 0] == LOSS
+    assert np.isnan(matrix[0, 0, 0])
+    wins, losses, ties = all_play_records(matrix)
+    assert wins[:, 0].tolist() == [1, 1, 0]
+    assert losses[:, 0].tolist() == [0, 0, 2]
+    assert ties[:, 0].tolist() == [1, 1, 0]
+
+
+def test_a_tie_is_half_a_win():
+    assert np.allclose(all_play_pct(np.array([1, 0]), np.array([0, 0]), np.array([1, 0])), [0.75, 0.0])
+    # two weeks, every team tied with everybody in the second
+    points = np.array([[100.0, 80.0], [90.0, 80.0], [80.0, 80.0]])
+    assert np.allclose(expected_wins(h2h_matrix(points)), [1.5, 1.0, 0.5])
+
+
+def test_a_week_without_a_score_is_skipped():
+    points = np.array([[100.0, np.nan], [90.0, 120.0], [80.0, 110.0]])
+    wins, losses, ties = all_play_records(h2h_matrix(points))
+    assert wins[:, 1].tolist() == [0, 1, 0]
+    assert losses[:, 1].tolist() == [0, 0, 1]
+    assert ties.sum() == 0
+
+
+def test_strength_of_schedule_only_counts_games_played():
+    points = np.array([[100.0, 100.0], [90.0, 90.0], [80.0, 80.0], [70.0, 70.0]])
+    opponents = np.array([[3, 1], [2, 0], [1, -1], [0, -1]])
+    # season all-play %: 1, 2/3, 1/3, 0
+    assert np.allclose(strength_of_schedule(h2h_matrix(points), opponents), [1 / 3, 2 / 3, 2 / 3, 1.0])
+    assert strength_of_schedule(h2h_matrix(points), np.full((4, 2), -1)).tolist() == [0, 0, 0, 0]
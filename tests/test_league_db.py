@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fantasy_objects import Season
+from league_db import add_season, connect, position_ranking, season_summary
+
+YEAR = 2024
+
+
+@pytest.fixture
+def season_and_db(weeks, tmp_path):
+    con = connect(str(tmp_path / "league.sqlite"))
+    add_season(con, YEAR, weeks)
+    yield Season(weeks), con
+    con.close()
+
+
+def test_season_summary_matches_season(season_and_db):
+    season, con = season_and_db
+    # season_summary_df rows are indexed by team id, the names without the emoji are season.teams
+    expected = season.season_summary_df.sort_index().assign(Team=season.teams).set_index("Team").sort_index()
+    df = season_summary(con, YEAR).set_index("Team").sort_index()
+    assert df.index.tolist() == expected.index.tolist()
+    for column in ["Power Ranking", "Record", "H2H"]:
+        assert df[column].tolist() == expected[column].tolist(), column
+    for column in ["PF", "PA", "PaP"]:
+        assert np.allclose(df[column], expected[column].astype(float), atol=0.01), column
+    assert np.allclose(df["Manager Eff"], expected["Manager Eff"].str.rstrip("%").astype(float), atol=0.01)
+
+
+def test_position_ranks_match_season(season_and_db):
+    season, con = season_and_db
+    expected = season.position_ranking_df.sort_values("Team").reset_index(drop=True)
+    pd.testing.assert_frame_equal(position_ranking(con, YEAR), expected, check_dtype=False)
+
+
+def test_adding_a_week_again_replaces_it(season_and_db, weeks):
+    _, con = season_and_db
+    before = pd.read_sql_query("SELECT COUNT(*) AS n FROM players", con)["n"][0]
+    add_season(con, YEAR, weeks[:1])
+    assert pd.read_sql_query("SELECT COUNT(*) AS n FROM players", con)["n"][0] == before
+    assert pd.read_sql_query("SELECT COUNT(*) AS n FROM weeks", con)["n"][0] == len(weeks)
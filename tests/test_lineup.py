@@ -0,0 +1,54 @@
+from collections import namedtuple
+from lineup import eligible_positions, optimal_lineup, optimal_points
+
+Slot = namedtuple("Slot", ["name", "position", "fan_pts"])
+
+
+def _roster(*players, wr=2) -> list[Slot]:
+    '''A full set of single position starters scoring 10 each (wr of them WRs), plus the given players'''
+    starters = [Slot(f"{position}{i}", position, 10.0) for position, n in [("QB", 1), ("WR", wr), ("RB", 2), ("TE", 1), ("DEF", 1)]
+                for i in range(n)]
+    return starters + list(players)
+
+
+def _slots(lineup: dict) -> dict[str, str]:
+    return {slot: player.name for slot, player in lineup.items()}
+
+
+def test_eligible_positions():
+    assert eligible_positions(Slot("a", "QB,TE", 0.0)) == ["QB", "TE"]
+    assert eligible_positions(Slot("a", "WR", 0.0)) == ["WR"]
+    assert eligible_positions(Slot("a", "(Empty)", 0.0)) == []
+    assert eligible_positions(Slot("a", None, 0.0)) == []
+
+
+def test_multi_position_player_fills_the_slot_worth_more():
+    lineup = optimal_lineup(_roster(Slot("Hill", "QB,TE", 30.0), Slot("QB backup", "QB", 25.0)))
+    # Hill at TE frees the QB slot for the 25 point backup, 30 + 25 beats 30 + 10
+    assert _slots(lineup)["TE"] == "Hill"
+    assert _slots(lineup)["QB"] == "QB backup"
+    # QB 25, TE 30, 2 WRs, 2 RBs and the DEF at 10, TE0 at FLEX
+    assert optimal_points(_roster(Slot("Hill", "QB,TE", 30.0), Slot("QB backup", "QB", 25.0))) == 115.0
+
+
+def test_multi_position_player_at_qb():
+    # 50 point WRs fill both FLEX slots, so a TE left out of the TE slot is left out of the lineup
+    wrs = [Slot(f"Star{i}", "WR", 50.0) for i in range(4)]
+    lineup = optimal_lineup(_roster(Slot("Hill", "QB,TE", 30.0), Slot("TE backup", "TE", 25.0), *wrs, wr=0))
+    assert _slots(lineup)["QB"] == "Hill"
+    assert _slots(lineup)["TE"] == "TE backup"
+
+
+def test_flex_takes_the_best_wr_rb_te_left():
+    lineup = _slots(optimal_lineup(_roster(Slot("WR3", "WR", 20.0), Slot("TE2", "TE", 15.0), Slot("QB2", "QB", 40.0),
+                                           Slot("RB3", "RB", 5.0))))
+    assert lineup["QB"] == "QB2" and lineup["WR1"] == "WR3" and lineup["TE"] == "TE2"
+    # the 10 point QB0 is never a FLEX, WR1 and TE0 are the best WR/RB/TE left
+    assert {lineup["FLEX1"], lineup["FLEX2"]} == {"WR1", "TE0"}
+    assert "QB0" not in lineup.values() and "RB3" not in lineup.values()
+
+
+def test_negative_def_still_starts_and_missing_slots_are_left_out():
+    lineup = optimal_lineup([Slot("QB", "QB", 20.0), Slot("DEF", "DEF", -4.0), Slot("Empty", "(Empty)", 0.0)])
+    assert _slots(lineup) == {"QB": "QB", "DEF": "DEF"}
+    assert optimal_points([Slot("QB", "QB", 20.0), Slot("DEF", "DEF", -4.0)]) == 16.0
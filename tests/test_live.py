@@ -0,0 +1,33 @@
+import asyncio
+import os
+import shutil
+from fantasy_objects import Week
+from live import LiveScoring, start_live
+
+SOURCE = "matchup_data/week14"
+
+
+def _drop(drop_dir, i):
+    shutil.copyfile(os.path.join(SOURCE, f"matchup_{i}.html"), os.path.join(drop_dir, f"matchup_{i}.html"))
+
+
+def test_out_of_order_snapshots_wait_for_the_gap(weeks, tmp_path):
+    live = LiveScoring(Week([], 14), drop_dir=str(tmp_path))
+    _drop(tmp_path, 3)
+    assert asyncio.run(live.poll()) == []
+    assert live.week.league_matchups == []
+    _drop(tmp_path, 1)
+    assert [update.matchup for update in asyncio.run(live.poll())] == [1]
+    _drop(tmp_path, 2)
+    assert [update.matchup for update in asyncio.run(live.poll())] == [2, 3]
+    saved = next(week for week in weeks if week.week == 14)
+    assert [matchup.teams for matchup in live.week.league_matchups] == [matchup.teams for matchup in saved.league_matchups[:3]]
+
+
+def test_start_live_keeps_a_snapshot_dropped_ahead(tmp_path):
+    _drop(tmp_path, 2)
+    live = start_live(99, str(tmp_path))
+    assert live.week.league_matchups == []
+    _drop(tmp_path, 1)
+    asyncio.run(live.poll())
+    assert len(live.week.league_matchups) == 2
@@ -0,0 +1,70 @@
+import pytest
+from fantasy_objects import Season
+from utils import EMPTY_SLOT, normalize_player_name, parse_player, player_key
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("C. OlaveIRPlayer Note", "C. Olave"),
+    ("J. BurrowNew Player Note", "J. Burrow"),
+    ("C. McCaffreyONew Player Note", "C. McCaffrey"),
+    ("C. TillmanQNew Player Note", "C. Tillman"),
+    ("DallasNo new player Notes", "Dallas"),
+    ("S. LaPortaQ", "S. LaPorta"),
+    ("T. Tracy Jr.", "T. Tracy Jr."),
+])
+def test_normalize_player_name(name, expected):
+    assert normalize_player_name(name) == expected
+
+
+def test_every_key_is_one_player(weeks):
+    index = Season(weeks).player_index
+    for key in index.keys:
+        players = set(index.appearances(key)["player"])
+        assert len(players) == 1, key
+        (player,) = players
+        assert key == player_key(player, key.split("|")[1] or None)
+        assert normalize_player_name(player) == player, key
+
+
+def test_appearances_cover_every_week(weeks):
+    season = Season(weeks)
+    df = season.player_df
+    raw = df[df["player"].astype(str).map(normalize_player_name).eq("J. Burrow") & df["nfl_team"].eq("CIN")]
+    assert list(season.player_index.appearances("J. Burrow", "CIN")["week"]) == sorted(raw["week"])
+
+
+@pytest.mark.parametrize("cell, expected", [
+    ("C. Edwards-HelaireKC - RB Final W 26-13 vs NO  New Player NoteNFI-R", ("C. Edwards-Helaire", "KC", "RB")),
+    ("J. Smith-NjigbaSea - WR Final L 13-20 @ GB  Player Note", ("J. Smith-Njigba", "SEA", "WR")),
+    ("D. Thompson-RobinsonCle - QB Bye  New Player Note", ("D. Thompson-Robinson", "CLE", "QB")),
+    ("C. RidleyTen - WR Final L 17-20 vs Ind", ("C. Ridley", "TEN", "WR")),
+])
+def test_parse_player_hyphenated_names(cell, expected):
+    assert parse_player(cell) == expected
+
+
+@pytest.mark.parametrize("cell, expected", [
+    ("J. Hurts", ("J. Hurts", None, None)),
+    ("J. Hurts ", ("J. Hurts", None, None)),
+    ("", (EMPTY_SLOT, None, EMPTY_SLOT)),
+    ("(Empty)", (EMPTY_SLOT, None, EMPTY_SLOT)),
+    (float("nan"), (EMPTY_SLOT, None, EMPTY_SLOT)),
+])
+def test_parse_player_without_a_position(cell, expected):
+    assert parse_player(cell) == expected
+
+
+def test_no_player_name_is_a_position(weeks):
+    season = Season(weeks)
+    df = season.player_df
+    df = df[df["position"] != EMPTY_SLOT]
+    assert not (df["position"].astype(str) == df["player"].astype(str)).any()
+    assert "J. Hurts" not in season.player_index._positions
+
+
+def test_hyphenated_names_keep_their_team(weeks):
+    index = Season(weeks).player_index
+    assert "j. smith-njigba|SEA" in index
+    assert "J. Smith-Njigba" in set(index.by_nfl_team("SEA")["player"])
+    assert "D. Thompson-Robinson" in set(index.by_nfl_team("CLE")["player"])
+    assert not [key for key in index.keys if key.endswith("|") and "-" in key]
@@ -0,0 +1,38 @@
+import numpy as np
+from playoff_odds import PLAYOFF_SPOTS, simulate_seeds, standings_order
+
+NO_GAMES = np.empty((0, 2), dtype=int)
+
+
+def test_standings_most_wins_then_pf():
+    assert standings_order(np.array([5, 7, 7, 3]), np.array([100.0, 90.0, 95.0, 200.0])).tolist() == [2, 1, 0, 3]
+    batch = standings_order(np.array([[1, 0], [0, 1]]), np.array([[0.0, 10.0], [10.0, 0.0]]))
+    assert batch.tolist() == [[0, 1], [1, 0]]
+
+
+def test_finished_season_seeds_are_the_standings():
+    points = np.full((6, 3), 100.0)
+    wins = np.array([1, 3, 2, 2, 0, 1])
+    pf = np.array([300.0, 310.0, 320.0, 290.0, 250.0, 305.0])
+    seeds = simulate_seeds(points, wins, pf, NO_GAMES, n_seasons=10, seed=0)
+    assert seeds.argmax(axis=0).tolist() == [1, 2, 3, 5, 0, 4]
+    assert (seeds.max(axis=0) == 1).all()
+
+
+def test_a_tie_goes_to_team2():
+    # both teams always score 100, team1 would take the top seed on PF
+    points = np.full((4, 2), 100.0)
+    seeds = simulate_seeds(points, np.zeros(4), np.array([210.0, 200.0, 0.0, 0.0]), np.array([[0, 1]]), n_seasons=100, seed=0)
+    assert seeds[1, 0] == 1 and seeds[0, 1] == 1
+
+
+def test_seed_odds_add_up():
+    rng = np.random.default_rng(1)
+    points = rng.normal(100, 20, (8, 10))
+    points[3, 4] = np.nan
+    matchups = np.array([[0, 1], [2, 3], [4, 5], [6, 7], [0, 2], [1, 3], [4, 6], [5, 7]])
+    wins, pf = np.array([6, 5, 5, 5, 4, 4, 3, 3]), np.nansum(points, axis=1)
+    seeds = simulate_seeds(points, wins, pf, matchups, n_seasons=5_000, seed=7)
+    assert np.allclose(seeds.sum(axis=0), 1) and np.allclose(seeds.sum(axis=1), 1)
+    assert seeds[:, :PLAYOFF_SPOTS].sum(axis=1).argmax() == 0
+    assert np.array_equal(seeds, simulate_seeds(points, wins, pf, matchups, n_seasons=5_000, seed=7))
@@ -0,0 +1,60 @@
+import copy
+import numpy as np
+import pandas as pd
+from fantasy_objects import MatchUp, Season, Week
+
+
+def _by_team(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sort_values("Team").reset_index(drop=True)
+
+
+def test_append_weeks_out_of_order(weeks):
+    full = Season(weeks)
+    season = Season([weeks[0]])
+    for i in [4, 1, 3, 2] + list(range(5, len(weeks))):
+        season.append_week(weeks[i])
+    assert [week.week for week in season.season_summary] == [week.week for week in weeks]
+    pd.testing.assert_frame_equal(_by_team(season.season_summary_df), _by_team(full.season_summary_df))
+    pd.testing.assert_frame_equal(_by_team(season.position_ranking_df), _by_team(full.position_ranking_df))
+    pd.testing.assert_frame_equal(season.get_points_for_df(3), full.get_points_for_df(3))
+    assert np.allclose(season._by_team_name(season.points()), full._by_team_name(full.points()), equal_nan=True)
+
+
+def test_back_filled_week_goes_in_at_its_place(weeks):
+    full = Season(weeks[:6])
+    season = Season(weeks[:2] + weeks[3:6])
+    season.append_week(weeks[2])
+    assert [week.week for week in season.season_summary] == [week.week for week in weeks[:6]]
+    assert season.points().columns.tolist() == full.points().columns.tolist()
+    pd.testing.assert_frame_equal(season.last_n_points(3), full.last_n_points(3))
+    pd.testing.assert_frame_equal(season.rankings_df, full.rankings_df)
+    # appending it again replaces it
+    season.append_week(weeks[2])
+    assert len(season.season_summary) == 6
+    pd.testing.assert_frame_equal(season.totals, full.totals)
+
+
+def test_team_df_with_a_duplicate_team_name(weeks):
+    matchups = list(weeks[0].league_matchups)
+    # a stale snapshot where one team still shows another team's name
+    renamed = copy.copy(matchups[1].team1_roster)
+    renamed.team_name = matchups[0].team1_roster.team_name
+    matchups[1] = MatchUp(renamed, matchups[1].team2_roster)
+    team_df = Week(matchups, weeks[0].week).team_df
+    expected = weeks[0].team_df
+    assert len(team_df) == len(expected)
+    assert np.allclose(team_df["pa"], expected["pa"])
+    assert (team_df["win"] == expected["win"]).all()
+
+
+def test_teams_that_swap_names_keep_their_ids(weeks):
+    matchups = list(weeks[1].league_matchups)
+    first, second = copy.copy(matchups[0].team1_roster), copy.copy(matchups[1].team1_roster)
+    first.team_name, second.team_name = second.team_name, first.team_name
+    matchups[0], matchups[1] = MatchUp(first, matchups[0].team2_roster), MatchUp(second, matchups[1].team2_roster)
+    swapped = Season([weeks[0], Week(matchups, weeks[1].week)] + weeks[2:4])
+    full = Season(weeks[:4])
+    pd.testing.assert_frame_equal(swapped.totals, full.totals)
+    pd.testing.assert_frame_equal(swapped.points(), full.points())
+    assert (swapped.opponents == full.opponents).all()
+    assert swapped.teams == full.teams
@@ -0,0 +1,43 @@
+import os
+import stat
+import threading
+import pandas as pd
+import season_cache
+from fantasy_objects import Season
+from season_cache import CACHE_MODE, read_cached_weeks, week_fingerprint, write_cached_weeks
+
+
+def test_concurrent_writes_leave_a_whole_cache(weeks, tmp_path, monkeypatch):
+    monkeypatch.setattr(season_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(season_cache, "CACHE_PATH", str(tmp_path / "season.arrow"))
+    fingerprints = {week.week: week_fingerprint(week.week) for week in weeks}
+    threads = [threading.Thread(target=write_cached_weeks, args=(weeks, fingerprints)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    cached = read_cached_weeks(fingerprints)
+    assert sorted(cached) == [week.week for week in weeks]
+    assert os.listdir(tmp_path) == ["season.arrow"]
+
+
+def test_cache_is_readable_by_other_users(weeks, tmp_path, monkeypatch):
+    monkeypatch.setattr(season_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(season_cache, "CACHE_PATH", str(tmp_path / "season.arrow"))
+    write_cached_weeks(weeks[:1], {weeks[0].week: week_fingerprint(weeks[0].week)})
+    assert stat.S_IMODE(os.stat(tmp_path / "season.arrow").st_mode) == CACHE_MODE
+
+
+def test_cached_week_aggregates_dont_build_matchups(weeks):
+    week = read_cached_weeks({weeks[0].week: week_fingerprint(weeks[0].week)})[weeks[0].week]
+    week.team_df, week.advanced_df
+    assert week._league_matchups is None
+    pd.testing.assert_frame_equal(week.advanced_df, weeks[0].advanced_df)
+    assert week.team_df["optimal"].tolist() == [roster.optimal_points for roster in weeks[0].league_rosters]
+
+
+def test_cached_season_aggregates_dont_build_matchups(weeks):
+    cached = read_cached_weeks({week.week: week_fingerprint(week.week) for week in weeks})
+    season = Season([cached[week] for week in sorted(cached)])
+    season.season_summary_df, season.position_ranking_df, season.schedule_luck_df
+    assert all(week._league_matchups is None for week in season.season_summary)
@@ -1,19 +1,10 @@
+from functools import lru_cache
+import re
+
 team_abbrev = ["ARI", "ATL", "BAL", "BUF", "CAR", "CHI", "CIN", "CLE", "DAL", "DEN", "DET", "GB", "HOU", "IND", "JAX", "KC", "MIA", "MIN", "NE", "NO", "NYG", "NYJ", "LV", "PHI", "PIT", "LAC", "SF", "SEA", "LAR", "TB", "TEN", "WAS"]
 
-manager_eff = {
-    "Jon Gruden" : 0.863,
-    "Im and the Gems" : 0.927,
-    "Liver King III" : 0.893,
-    "Miles Long" : 0.871,
-    "Flavortown" : 0.827,
-    "EZ DubZ" : 0.862,
-    "Njigba’s in Paris" : 0.839,
-    "Kamalas Hairy Clit" : 0.839,
-    "Pitter Patter" : 0.891,
-    "Gales" : 0.916,
-    "A Nu Start" : 0.834,
-    "ELC3" : 0.869
-}
+# the season matchup_data/ and schedule are for
+SEASON = 2024
 
 schedule = {
     'week15' : [["Im and the Gems", "Liver King III"],
@@ -24,31 +15,62 @@ schedule = {
                 ["Njigba’s in Paris", 'ELC3']]
 }
 
+# old team name -> the name it was changed to, for renames that can't be linked by the Yahoo team number
+team_aliases = {}
+
+# a Player cell that is empty (nan) in the html is the same as a slot Yahoo shows as "(Empty)"
+EMPTY_SLOT = "(Empty)"
+# the raw cells hold the week's game result so they rarely repeat, the name + team part does every week
+PLAYER_CACHE_SIZE = 4096
+_TEAM_ABBREV = frozenset(team_abbrev)
+# Yahoo glues the player note link and the injury status onto the name, e.g. "C. OlaveIRPlayer Note"
+_RE_PLAYER_NOTE = re.compile(r"\s*(No new player Notes?|(New )?Player Notes?)\s*$")
+_RE_PLAYER_STATUS = re.compile(r"(?<=[a-z.])(IR-R|IR|PUP-R|PUP|NFI-R|SUSP|NA|Q|D|O|P)$")
+
+@lru_cache(maxsize=PLAYER_CACHE_SIZE)
+def _name_and_team(text: str) -> tuple[str, None | str]:
+    '''Split the "<name><team>" part of a player cell, the team is the last 2 (or 3) letters when they are an NFL team
+
+    the cell is already cut at the " - " before the position, so a hyphenated name (J. Smith-Njigba) stays whole
+    '''
+    text = text.strip()
+    if text[-2:].upper() in _TEAM_ABBREV:
+        return text[:-2], text[-2:].upper()
+    if text[-3:].upper() in _TEAM_ABBREV:
+        return text[:-3], text[-3:].upper()
+    return text, None
+
+def parse_player(text) -> tuple[str, None | str, str]:
+    '''Returns the (name, team, position) of Yahoo player html, e.g. "C. RidleyTen - WR Final L 17-20 vs Ind"
+
+    empty (bye week or unfilled) slots are returned as ("(Empty)", None, "(Empty)"), a player shown
+    without " - team - position" (no game that week) gets a position of None
+    '''
+    if not isinstance(text, str) or not text.strip() or text.strip() == EMPTY_SLOT:
+        return EMPTY_SLOT, None, EMPTY_SLOT
+    head, separator, tail = text.partition(" - ")
+    name, team = _name_and_team(head)
+    position = tail.split(" ")[0] if separator else None
+    return name, team, position
+
 def extract_position(text) -> str:
     '''function that extracts the position from Yahoo player html'''
-    try:
-        text = text.split(" - ")[1].split(" ")[0]
-    except:
-        pass
-    return text
+    return parse_player(text)[2]
 
 def extract_player_name(text) -> str:
     '''function that extracts the player name from the Yahoo player html'''
-    text = str(text).split("-")[0].strip()
-    if text[-2:].upper() in team_abbrev:
-        player = text[:-2]
-    elif text[-3:].upper() in team_abbrev:
-        player = text[:-3]
-    else:
-        player = text
-    return player
+    return parse_player(text)[0]
 
 def extract_team(text) -> None | str:
     '''function that extracts the team name from the Yahoo player html'''
-    text = str(text).split("-")[0].strip()
-    if text[-2:].upper() in team_abbrev:
-        return text[-2:].upper()
-    elif text[-3:].upper() in team_abbrev:
-        return text[-3:].upper()
-    else:
-        return None
\ No newline at end of file
+    return parse_player(text)[1]
+
+@lru_cache(maxsize=PLAYER_CACHE_SIZE)
+def normalize_player_name(name: str) -> str:
+    '''Returns a player name without the note link and injury status Yahoo sometimes adds to it, e.g. "C. OlaveIRPlayer Note" or "B. PurdyQNew Player Note" -> "C. Olave", "B. Purdy"'''
+    name = _RE_PLAYER_NOTE.sub("", " ".join(name.split()))
+    return _RE_PLAYER_STATUS.sub("", name)
+
+def player_key(name: str, team: None | str) -> str:
+    '''Returns the key a player is known by across weeks, their normalized name and NFL team, e.g. "c. kupp|LAR"'''
+    return f"{normalize_player_name(name).casefold()}|{team or ''}"